@@ -8,6 +8,19 @@ to enable company administrators to maintain their Airtable tables without manua
 __author__ = "Felipe Catapano Emrich Melo"
 __email__ = "f.melo@lsb.com.br"
 
+import asyncio
+
 from .config import settings
 
-__all__ = ["settings"]
\ No newline at end of file
+
+def install_uvloop() -> bool:
+    """Use uvloop's event loop policy when available; falls back to asyncio (e.g. on Windows)."""
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+__all__ = ["settings", "install_uvloop"]
\ No newline at end of file
@@ -3,21 +3,157 @@ LangGraph builder for the autonomous agent.
 Creates and configures the agent workflow graph.
 """
 
+import asyncio
+import itertools
 import logging
-from typing import Any, Dict, List
-from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
+import re
+import sys
+from secrets import token_hex
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Hashable, List, Optional, Set
+import orjson
+import redis.asyncio as redis
 from langchain.schema import HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
 from .state_manager import StateManager, AgentGraphState
-from .tool_registry import ToolRegistry
-from ..models.agent import AgentState, AgentDecision, AgentAction
+from .tool_registry import ToolRegistry, AIRTABLE_BATCH_LIMIT
+from .llm_cache import SemanticLLMCache, CachedChatOpenAI
+from ..models.agent import AgentStateType, AgentDecision, AgentDecisionType, AgentAction, AgentActionType, ConfidenceLevel
 
+if TYPE_CHECKING:
+    from langgraph.graph import StateGraph
 
-logger = logging.getLogger(__name__)
+
+_N_ANALYZE = sys.intern("analyze_input")
+_N_DECIDE = sys.intern("make_decision")
+_N_EXECUTE = sys.intern("execute_action")
+_N_HANDLE_ERROR = sys.intern("handle_error")
+_N_RESPOND = sys.intern("generate_response")
+
+_R_ANALYZE = sys.intern("analyze")
+_R_DECIDE = sys.intern("decide")
+_R_EXECUTE = sys.intern("execute")
+_R_RESPOND = sys.intern("respond")
+_R_RETRY = sys.intern("retry")
+_R_ERROR = sys.intern("error")
+_R_END = sys.intern("end")
+# Same value as langgraph.graph.END, which is only imported when the graph is built
+_END = sys.intern("__end__")
+
+_EDGES_AFTER_ANALYSIS = {
+    _R_DECIDE: _N_DECIDE,
+    _R_ERROR: _N_HANDLE_ERROR,
+    _R_RESPOND: _N_RESPOND
+}
+_EDGES_AFTER_DECISION = {
+    _R_EXECUTE: _N_EXECUTE,
+    _R_RESPOND: _N_RESPOND,
+    _R_ERROR: _N_HANDLE_ERROR
+}
+_EDGES_AFTER_EXECUTION = {
+    _R_DECIDE: _N_DECIDE,
+    _R_EXECUTE: _N_EXECUTE,
+    _R_RESPOND: _N_RESPOND,
+    _R_ERROR: _N_HANDLE_ERROR,
+    _R_END: _END
+}
+_EDGES_AFTER_ERROR = {
+    _R_RETRY: _N_ANALYZE,
+    _R_RESPOND: _N_RESPOND,
+    _R_END: _END
+}
+
+# Metadata keys read on every turn by nodes and routers
+_K_PERMISSIONS = sys.intern("permissions")
+_K_ANALYSIS = sys.intern("analysis")
+_K_REQUIRES_ACTION = sys.intern("analysis_requires_action")
+_K_INTENT = sys.intern("analysis_intent")
+_K_RESPONSE_MESSAGE = sys.intern("response_message")
+_K_FINAL_RESPONSE = sys.intern("final_response")
+_K_SHOULD_RETRY = sys.intern("recovery_should_retry")
+_K_RECOVERY_STRATEGY = sys.intern("recovery_strategy")
+
+# The semantic cache is an optimization; a slow embeddings call falls through to the LLM
+SEMANTIC_CACHE_TIMEOUT_S = 2.0
+
+_TRIVIAL_INTENTS = frozenset({"greeting", "thanks", "chitchat"})
+_CANNED = MappingProxyType({
+    "greeting": "Hello! How can I help you today?",
+    "thanks": "You're welcome! Let me know if there's anything else I can do.",
+    "chitchat": "I'm here to help with your records and messages. What would you like to do?"
+})
+
+_JSON_RE = re.compile(rb"\{.*\}", re.DOTALL)
+_DEFAULT_ANALYSIS = MappingProxyType({"intent": "unknown", "requires_action": False, "urgency": "low"})
+_DEFAULT_RECOVERY = MappingProxyType({
+    "should_retry": False,
+    "error_message": "I encountered an error. Please try again.",
+    "suggested_action": "retry"
+})
+
+_SYS_ANALYZE = SystemMessage(content="""
+You are an AI assistant that analyzes user messages to understand intent and determine if actions are needed.
+
+Analyze the user's message and respond with a JSON object containing:
+- intent: The user's primary intent (question, request, command, etc.)
+- entities: Any important entities mentioned (names, dates, numbers, etc.)
+- requires_action: Boolean indicating if this requires tool usage or actions
+- urgency: Low, medium, or high
+- context_needed: Any additional context that might be needed
+
+Be concise and accurate in your analysis.
+""")
+_SYS_DECIDE = SystemMessage(content="""
+You are an autonomous AI agent that makes decisions about what actions to take based on user requests.
+
+You have access to various tools for:
+- Managing Airtable records (contacts, projects, tasks)
+- Sending WhatsApp messages and media
+- Scheduling tasks
+- Utility functions
+
+Based on the user's message and analysis, decide what actions to take. You can:
+1. Use tools to retrieve or modify data
+2. Send messages or notifications
+3. Schedule tasks
+4. Ask for clarification
+
+Always prioritize user safety and data privacy. Only perform actions that are clearly requested or necessary.
+Use function calls if tools are needed, or explain your reasoning.
+""")
+_SYS_RECOVER = SystemMessage(content="""
+You are helping recover from an error. Analyze the error and determine the best recovery strategy.
+
+Respond with JSON containing:
+- should_retry: Boolean indicating if we should retry
+- error_message: User-friendly error message
+- suggested_action: What the user should do
+""")
+_SYS_RESPOND = SystemMessage(content="""
+Generate a helpful, friendly response to the user based on the conversation and any actions taken.
+
+Be concise, clear, and professional. If actions were taken, summarize what was done.
+If information was retrieved, present it in a useful format.
+""")
+
+
+def _builder_node(method_name: str):
+    """Create a graph node that dispatches to the GraphBuilder passed in the run config."""
+    async def node(state: AgentGraphState, config: RunnableConfig) -> AgentGraphState:
+        builder = config["configurable"]["builder"]
+        result = await getattr(builder, method_name)(state)
+        # One updated_at_ns stamp per node, however many mutators the node called
+        builder.state_manager.commit(state["session_id"])
+        return result
+    node.__name__ = method_name
+    return node
 
 
 class GraphBuilder:
     """Builds and configures the LangGraph workflow for the autonomous agent."""
+
+    # Compiled graphs are shared across builders; nodes resolve their builder from the run config
+    _COMPILED: Dict[str, Any] = {}
     
     def __init__(
         self,
@@ -27,66 +163,53 @@ class GraphBuilder:
         model_name: str = "gpt-4-turbo-preview",
         temperature: float = 0.5,
         max_tokens: int = 2000,
+        semantic_cache_threshold: float = 0.92,
+        redis_client: Optional[redis.Redis] = None,
     ):
         """Initialize graph builder."""
+        from langchain_openai import ChatOpenAI, OpenAIEmbeddings
         self.logger = logging.getLogger(__name__)
         self.state_manager = state_manager
         self.tool_registry = tool_registry
-        self.llm = ChatOpenAI(
+        self.llm = CachedChatOpenAI(ChatOpenAI(
             api_key=openai_api_key,
             model=model_name,
             temperature=temperature,
             max_tokens=max_tokens
-        )
-        self.graph = self._build_graph()
+        ), redis_client=redis_client)
+        # Analysis and recovery expect JSON, so they run deterministically and are cacheable
+        self.json_llm = CachedChatOpenAI(ChatOpenAI(
+            api_key=openai_api_key,
+            model=model_name,
+            temperature=0,
+            max_tokens=max_tokens
+        ), redis_client=redis_client)
+        self._system_prompt_cache: Dict[tuple, SystemMessage] = {}
+        self.stats = {"canned_responses": 0, "generated_responses": 0}
+        self.semantic_cache = SemanticLLMCache(OpenAIEmbeddings(api_key=openai_api_key), threshold=semantic_cache_threshold)
+        # Cache writes that still need an embedding run off the reply path; references keep them alive
+        self._cache_tasks: Set[asyncio.Task] = set()
+        if model_name not in GraphBuilder._COMPILED:
+            GraphBuilder._COMPILED[model_name] = self._build_graph()
+        self.graph = GraphBuilder._COMPILED[model_name]
+        self._bound_graph = self.graph.with_config(configurable={"builder": self})
         
-    def _build_graph(self) -> StateGraph:
+    @staticmethod
+    def _build_graph() -> "StateGraph":
         """Build the LangGraph workflow."""
+        from langgraph.graph import StateGraph, END
         workflow = StateGraph(AgentGraphState)
-        workflow.add_node("analyze_input", self._analyze_input_node)
-        workflow.add_node("make_decision", self._make_decision_node)
-        workflow.add_node("execute_action", self._execute_action_node)
-        workflow.add_node("handle_error", self._handle_error_node)
-        workflow.add_node("generate_response", self._generate_response_node)
-        workflow.set_entry_point("analyze_input")
-        workflow.add_conditional_edges(
-            "analyze_input",
-            self._should_continue_after_analysis,
-            {
-                "decide": "make_decision",
-                "error": "handle_error",
-                "respond": "generate_response"
-            }
-        )
-        workflow.add_conditional_edges(
-            "make_decision",
-            self._should_continue_after_decision,
-            {
-                "execute": "execute_action",
-                "respond": "generate_response",
-                "error": "handle_error"
-            }
-        )
-        workflow.add_conditional_edges(
-            "execute_action",
-            self._should_continue_after_execution,
-            {
-                "decide": "make_decision",
-                "respond": "generate_response",
-                "error": "handle_error",
-                "end": END
-            }
-        )
-        workflow.add_conditional_edges(
-            "handle_error",
-            self._should_continue_after_error,
-            {
-                "retry": "analyze_input",
-                "respond": "generate_response",
-                "end": END
-            }
-        )
-        workflow.add_edge("generate_response", END)
+        workflow.add_node(_N_ANALYZE, _builder_node("_analyze_input_node"))
+        workflow.add_node(_N_DECIDE, _builder_node("_make_decision_node"))
+        workflow.add_node(_N_EXECUTE, _builder_node("_execute_action_node"))
+        workflow.add_node(_N_HANDLE_ERROR, _builder_node("_handle_error_node"))
+        workflow.add_node(_N_RESPOND, _builder_node("_generate_response_node"))
+        workflow.set_entry_point(_N_ANALYZE)
+        workflow.add_conditional_edges(_N_ANALYZE, GraphBuilder._should_continue_after_analysis, _EDGES_AFTER_ANALYSIS)
+        workflow.add_conditional_edges(_N_DECIDE, GraphBuilder._should_continue_after_decision, _EDGES_AFTER_DECISION)
+        workflow.add_conditional_edges(_N_EXECUTE, GraphBuilder._should_continue_after_execution, _EDGES_AFTER_EXECUTION)
+        workflow.add_conditional_edges(_N_HANDLE_ERROR, GraphBuilder._should_continue_after_error, _EDGES_AFTER_ERROR)
+        workflow.add_edge(_N_RESPOND, END)
         return workflow.compile()
         
 
@@ -95,40 +218,88 @@ class GraphBuilder:
         """Analyze user input node."""
         self.logger.info("Analyzing user input")
         try:
-            if not state["current_message"]:
+            message = state["current_message"]
+            if not message:
                 state["last_error"] = "No message to analyze"
                 return state
-            state["available_tools"] = [tool.name for tool in self.tool_registry.get_all_tools()]
-            analysis_prompt = self._create_analysis_prompt(state)
-            response = await self.llm.ainvoke(analysis_prompt)
-            analysis = self._parse_analysis_response(response.content)
-            state["metadata"]["analysis"] = analysis
-            state["current_state"] = AgentState.PROCESSING
-            self.state_manager.add_message_to_history(state["session_id"], state["current_message"], "user", state.get("message_type", "text"))
+            session_id = state["session_id"]
+            metadata = state["metadata"]
+            available_tools = [tool.name for tool in self.tool_registry.get_available_tools(frozenset(metadata.get(_K_PERMISSIONS, [])))]
+            state["available_tools"] = available_tools
+            recent_context = self.state_manager.get_recent_context(session_id)
+            cache_scope = self.semantic_cache.make_scope(available_tools, recent_context)
+            analysis_prompt = self._create_analysis_prompt(state, recent_context)
+            embedding = analysis = None
+            # An empty scope cannot hit, so the embedding is only fetched up front when a lookup can pay off
+            if self.semantic_cache.has_entries(cache_scope):
+                embedding = await self._embed_for_cache(message)
+                if embedding is not None:
+                    try:
+                        analysis = self.semantic_cache.get(embedding, cache_scope)
+                    except Exception as e:
+                        self.logger.warning("Semantic cache lookup failed: %s", e)
+            if analysis is None:
+                response = await self.json_llm.ainvoke(analysis_prompt)
+                analysis = self._parse_analysis_response(response.content)
+                # The fallback stands in for an unparseable reply and must not be replayed to similar messages
+                if analysis is not _DEFAULT_ANALYSIS:
+                    if embedding is not None:
+                        self._cache_analysis(embedding, cache_scope, analysis)
+                    else:
+                        task = asyncio.get_running_loop().create_task(self._embed_and_cache_analysis(message, cache_scope, analysis))
+                        self._cache_tasks.add(task)
+                        task.add_done_callback(self._cache_tasks.discard)
+            metadata[_K_ANALYSIS] = dict(analysis)
+            metadata[_K_REQUIRES_ACTION] = bool(analysis.get("requires_action", False))
+            metadata[_K_INTENT] = str(analysis.get("intent", "")).lower()
+            state["current_state"] = AgentStateType.PROCESSING
+            self.state_manager.add_message_to_history(session_id, message, "user", state.get("message_type", "text"))
         except Exception as e:
-            self.logger.error(f"Analysis error: {str(e)}")
-            state["current_state"] = AgentState.ERROR
+            self.logger.error("Analysis error: %s", e)
+            state["current_state"] = AgentStateType.ERROR
             state["last_error"] = str(e) 
         return state
         
+    async def _embed_for_cache(self, message: str) -> Optional[List[float]]:
+        """Embed a message for the semantic cache, or None when the embeddings call fails or is slow."""
+        try:
+            return await asyncio.wait_for(self.semantic_cache.embed(message), SEMANTIC_CACHE_TIMEOUT_S)
+        except Exception as e:
+            self.logger.warning("Semantic cache embedding failed: %s", e)
+            return None
+            
+    def _cache_analysis(self, embedding: List[float], scope: Hashable, analysis: Dict[str, Any]) -> None:
+        """Store a parsed analysis in the semantic cache."""
+        try:
+            self.semantic_cache.put(embedding, scope, analysis)
+        except Exception as e:
+            self.logger.warning("Semantic cache write failed: %s", e)
+            
+    async def _embed_and_cache_analysis(self, message: str, scope: Hashable, analysis: Dict[str, Any]) -> None:
+        """Embed a message after its reply has moved on, then cache its analysis."""
+        embedding = await self._embed_for_cache(message)
+        if embedding is not None:
+            self._cache_analysis(embedding, scope, analysis)
+        
     async def _make_decision_node(self, state: AgentGraphState) -> AgentGraphState:
         """Decision making node."""
         self.logger.info("Making decision")
         try:
             decision_prompt = self._create_decision_prompt(state)
-            available_tools = self.tool_registry.get_all_tool_schemas()
+            available_tools = self.tool_registry.get_all_tool_schemas(frozenset(state["metadata"].get(_K_PERMISSIONS, [])))
             if available_tools:
                 response = await self.llm.ainvoke(decision_prompt, functions=available_tools)
             else:
                 response = await self.llm.ainvoke(decision_prompt)
             decision = self._parse_decision_response(response, state)
-            self.state_manager.record_decision(state["session_id"], decision)
+            session_id = state["session_id"]
+            self.state_manager.record_decision(session_id, decision)
             state["last_decision"] = decision
             for action in decision.actions:
-                self.state_manager.add_pending_action(state["session_id"], action)
+                self.state_manager.add_pending_action(session_id, action)
         except Exception as e:
-            self.logger.error(f"Decision error: {str(e)}")
-            state["current_state"] = AgentState.ERROR
+            self.logger.error("Decision error: %s", e)
+            state["current_state"] = AgentStateType.ERROR
             state["last_error"] = str(e)
         return state
         
@@ -136,127 +307,173 @@ class GraphBuilder:
         """Action execution node."""
         self.logger.info("Executing action")
         try:
-            action = self.state_manager.get_next_action(state["session_id"])
-            if not action:
+            session_id = state["session_id"]
+            actions = self.state_manager.drain_independent_actions(session_id, self.tool_registry)
+            if not actions:
                 return state
-            state["current_state"] = AgentState.EXECUTING_TASK
-            if action.action_type == "tool_call":
-                result = await self.tool_registry.execute_tool(action.tool_name, action.parameters, state["metadata"].get("permissions", []))
-                self.state_manager.record_tool_result(state["session_id"], action.tool_name, result.result, result.success)
-                if not result.success:
-                    state["current_state"] = AgentState.ERROR
-                    state["last_error"] = result.error
-            elif action.action_type == "send_message":
-                state["metadata"]["response_message"] = action.parameters.get("message")
-            elif action.action_type == "wait_for_input":
-                state["current_state"] = AgentState.WAITING_FOR_INPUT
+            state["current_state"] = AgentStateType.EXECUTING_TASK
+            if actions[0].action_type == AgentActionType.TOOL_CALL:
+                permissions = frozenset(state["metadata"].get(_K_PERMISSIONS, ()))
+                results = await self._run_tool_calls(actions, permissions, session_id)
+                for action, result in zip(actions, results):
+                    if isinstance(result, Exception):
+                        self.state_manager.record_tool_result(session_id, action.tool_name, None, False)
+                        error = str(result)
+                    else:
+                        self.state_manager.record_tool_result(session_id, action.tool_name, result.result, result.success)
+                        error = None if result.success else result.error
+                    if error and state["current_state"] != AgentStateType.ERROR:
+                        state["current_state"] = AgentStateType.ERROR
+                        state["last_error"] = error
+            elif actions[0].action_type == AgentActionType.SEND_MESSAGE:
+                state["metadata"][_K_RESPONSE_MESSAGE] = actions[0].parameters.get("message")
+            elif actions[0].action_type == AgentActionType.WAIT_FOR_INPUT:
+                state["current_state"] = AgentStateType.WAITING_FOR_INPUT
         except Exception as e:
-            self.logger.error(f"Execution error: {str(e)}")
-            state["current_state"] = AgentState.ERROR
+            self.logger.error("Execution error: %s", e)
+            state["current_state"] = AgentStateType.ERROR
             state["last_error"] = str(e)
         return state
         
+    async def _run_tool_calls(self, actions: List[AgentAction], permissions: FrozenSet[str], session_id: str) -> List[Any]:
+        """Run independent tool calls concurrently, coalescing record updates on the same table into batch requests."""
+        calls = []
+        groups = itertools.groupby(actions, key=lambda a: (a.tool_name, a.parameters.get("table_name"), a.parameters.get("base_id")))
+        for (tool_name, table_name, base_id), group in groups:
+            group = list(group)
+            if tool_name != "update_airtable_record" or len(group) < 2:
+                calls.extend(([action], (action.tool_name, action.parameters, action.parameters_raw)) for action in group)
+                continue
+            for start in range(0, len(group), AIRTABLE_BATCH_LIMIT):
+                chunk = group[start:start + AIRTABLE_BATCH_LIMIT]
+                parameters = {"table_name": table_name, "records": [{"id": a.parameters["record_id"], "fields": a.parameters["fields"]} for a in chunk]}
+                if base_id:
+                    parameters["base_id"] = base_id
+                calls.append((chunk, ("batch_update_airtable_records", parameters, None)))
+        outcomes = await self.tool_registry.execute_tools([call for _, call in calls], permissions, session_id=session_id)
+        results = []
+        for (chunk, _), outcome in zip(calls, outcomes):
+            if len(chunk) == 1 or isinstance(outcome, Exception) or not isinstance(outcome.result, list):
+                results.extend(outcome for _ in chunk)
+                continue
+            # Hand each action the record it updated so results keep per-action granularity
+            by_id = {record.get("id"): record for record in outcome.result if isinstance(record, dict)}
+            results.extend(outcome.model_copy(update={"result": by_id.get(a.parameters["record_id"])}) for a in chunk)
+        return results
+
     async def _handle_error_node(self, state: AgentGraphState) -> AgentGraphState:
         """Error handling node."""
-        self.logger.info(f"Handling error: {state.get('last_error')}")
+        self.logger.info("Handling error: %s", state.get("last_error"))
+        metadata = state["metadata"]
+        metadata[_K_SHOULD_RETRY] = False
         try:
             error_count = state["error_count"]
             if error_count < 3:  # Retry up to 3 times
                 recovery_prompt = self._create_error_recovery_prompt(state)
-                response = await self.llm.ainvoke(recovery_prompt)
+                response = await self.json_llm.ainvoke(recovery_prompt)
                 recovery = self._parse_recovery_response(response.content)
                 if recovery.get("should_retry", False):
-                    state["current_state"] = AgentState.PROCESSING
-                    state["metadata"]["recovery_strategy"] = recovery
+                    state["current_state"] = AgentStateType.PROCESSING
+                    metadata[_K_RECOVERY_STRATEGY] = recovery
+                    metadata[_K_SHOULD_RETRY] = True
                 else:
-                    state["metadata"]["response_message"] = recovery.get("error_message", "I encountered an error and cannot complete this request.")
+                    metadata[_K_RESPONSE_MESSAGE] = recovery.get("error_message", "I encountered an error and cannot complete this request.")
             else:
                 # Too many errors, give up
-                state["metadata"]["response_message"] = ("I'm experiencing technical difficulties. " "Please try again later or contact support.")
+                metadata[_K_RESPONSE_MESSAGE] = ("I'm experiencing technical difficulties. " "Please try again later or contact support.")
         except Exception as e:
-            self.logger.error(f"Error handling failed: {str(e)}")
-            state["metadata"]["response_message"] = ("I'm experiencing technical difficulties. " "Please try again later.")
+            self.logger.error("Error handling failed: %s", e)
+            metadata[_K_RESPONSE_MESSAGE] = ("I'm experiencing technical difficulties. " "Please try again later.")
         return state
         
     async def _generate_response_node(self, state: AgentGraphState) -> AgentGraphState:
         """Response generation node."""
         self.logger.info("Generating response")
+        session_id = state["session_id"]
+        metadata = state["metadata"]
         try:
-            if "response_message" in state["metadata"]:
-                response_text = state["metadata"]["response_message"]
+            intent = metadata.get(_K_INTENT)
+            if _K_RESPONSE_MESSAGE in metadata:
+                response_text = metadata[_K_RESPONSE_MESSAGE]
+            elif intent in _CANNED and not state.get("tool_results"):
+                response_text = _CANNED[intent]
+                self.stats["canned_responses"] += 1
             else:
+                self.stats["generated_responses"] += 1
                 response_prompt = self._create_response_prompt(state)
                 response = await self.llm.ainvoke(response_prompt)
                 response_text = response.content
-            self.state_manager.add_message_to_history(state["session_id"], response_text, "assistant", "text")
-            state["metadata"]["final_response"] = response_text
-            state["current_state"] = AgentState.IDLE
+            self.state_manager.add_message_to_history(session_id, response_text, "assistant", "text")
+            metadata[_K_FINAL_RESPONSE] = response_text
+            state["current_state"] = AgentStateType.IDLE
         except Exception as e:
-            self.logger.error(f"Response generation error: {str(e)}")
-            state["metadata"]["final_response"] = ("I apologize, but I'm having trouble generating a response. " "Please try again.")
+            self.logger.error("Response generation error: %s", e)
+            metadata[_K_FINAL_RESPONSE] = ("I apologize, but I'm having trouble generating a response. " "Please try again.")
         return state
             
-    def _should_continue_after_analysis(self, state: AgentGraphState) -> str:
+    @staticmethod
+    def _should_continue_after_analysis(state: AgentGraphState) -> str:
         """Determine next step after input analysis."""
-        if state["current_state"] == AgentState.ERROR:
-            return "error"
-        elif state["metadata"].get("analysis", {}).get("requires_action", False):
-            return "decide"
+        metadata = state["metadata"]
+        if state["current_state"] == AgentStateType.ERROR:
+            return _R_ERROR
+        elif metadata.get(_K_INTENT) in _TRIVIAL_INTENTS:
+            return _R_RESPOND
+        elif metadata.get(_K_REQUIRES_ACTION, False):
+            return _R_DECIDE
         else:
-            return "respond"
+            return _R_RESPOND
             
-    def _should_continue_after_decision(self, state: AgentGraphState) -> str:
+    @staticmethod
+    def _should_continue_after_decision(state: AgentGraphState) -> str:
         """Determine next step after decision making."""
-        if state["current_state"] == AgentState.ERROR:
-            return "error"
+        if state["current_state"] == AgentStateType.ERROR:
+            return _R_ERROR
         elif state["pending_actions"]:
-            return "execute"
+            return _R_EXECUTE
         else:
-            return "respond"
+            return _R_RESPOND
             
-    def _should_continue_after_execution(self, state: AgentGraphState) -> str:
+    @staticmethod
+    def _should_continue_after_execution(state: AgentGraphState) -> str:
         """Determine next step after action execution."""
-        if state["current_state"] == AgentState.ERROR:
-            return "error"
+        if state["current_state"] == AgentStateType.ERROR:
+            return _R_ERROR
         elif state["pending_actions"]:
-            return "execute"  # More actions to execute
-        elif state["current_state"] == AgentState.WAITING_FOR_INPUT:
-            return "end"  # Wait for user input
+            return _R_EXECUTE  # More actions to execute
+        elif state["current_state"] == AgentStateType.WAITING_FOR_INPUT:
+            return _R_END  # Wait for user input
         else:
-            return "respond"
+            return _R_RESPOND
             
-    def _should_continue_after_error(self, state: AgentGraphState) -> str:
+    @staticmethod
+    def _should_continue_after_error(state: AgentGraphState) -> str:
         """Determine next step after error handling."""
-        if state["error_count"] < 3 and state["metadata"].get("recovery_strategy", {}).get("should_retry", False):
-            return "retry"
-        elif "response_message" in state["metadata"]:
-            return "respond"
+        metadata = state["metadata"]
+        if state["error_count"] < 3 and metadata.get(_K_SHOULD_RETRY, False):
+            return _R_RETRY
+        elif _K_RESPONSE_MESSAGE in metadata:
+            return _R_RESPOND
         else:
-            return "end"
+            return _R_END
 
-    def _create_analysis_prompt(self, state: AgentGraphState) -> List:
-        """Create prompt for input analysis."""
-        system_message = SystemMessage(content="""
-You are an AI assistant that analyzes user messages to understand intent and determine if actions are needed.
+    def _system_with_tools(self, base: SystemMessage, available_tools: List[str]) -> SystemMessage:
+        """Get a system message with the tool list appended, reused per tool set so the prefix stays byte-identical."""
+        key = (base.content, tuple(available_tools))
+        message = self._system_prompt_cache.get(key)
+        if message is None:
+            message = SystemMessage(content=f"{base.content}\nAvailable tools: {', '.join(available_tools)}\n")
+            self._system_prompt_cache[key] = message
+        return message
 
-Analyze the user's message and respond with a JSON object containing:
-- intent: The user's primary intent (question, request, command, etc.)
-- entities: Any important entities mentioned (names, dates, numbers, etc.)
-- requires_action: Boolean indicating if this requires tool usage or actions
-- urgency: Low, medium, or high
-- context_needed: Any additional context that might be needed
-
-Be concise and accurate in your analysis.
-""")
-        history = state["conversation_history"][-5:]  # Last 5 messages
-        context = "\n".join([f"{msg['sender']}: {msg['message']}" for msg in history])
+    def _create_analysis_prompt(self, state: AgentGraphState, context: str) -> List:
+        """Create prompt for input analysis."""
+        system_message = self._system_with_tools(_SYS_ANALYZE, state["available_tools"])
         human_message = HumanMessage(content=f"""
-Current message: {state['current_message']}
-
 Recent conversation:
 {context}
 
-Available tools: {', '.join(state['available_tools'])}
+Current message: {state['current_message']}
 
 Please analyze this message.
 """)
@@ -264,47 +481,23 @@ Please analyze this message.
         
     def _create_decision_prompt(self, state: AgentGraphState) -> List:
         """Create prompt for decision making."""
-        system_message = SystemMessage(content="""
-You are an autonomous AI agent that makes decisions about what actions to take based on user requests.
-
-You have access to various tools for:
-- Managing Airtable records (contacts, projects, tasks)
-- Sending WhatsApp messages and media
-- Scheduling tasks
-- Utility functions
-
-Based on the user's message and analysis, decide what actions to take. You can:
-1. Use tools to retrieve or modify data
-2. Send messages or notifications
-3. Schedule tasks
-4. Ask for clarification
-
-Always prioritize user safety and data privacy. Only perform actions that are clearly requested or necessary.
-""")
-        analysis = state["metadata"].get("analysis", {})
+        system_message = self._system_with_tools(_SYS_DECIDE, state["available_tools"])
+        analysis = state["metadata"].get(_K_ANALYSIS, {})
         human_message = HumanMessage(content=f"""
-User message: {state['current_message']}
 Analysis: {analysis}
-Available tools: {state['available_tools']}
+User message: {state['current_message']}
 
-What actions should I take? Use function calls if tools are needed, or explain your reasoning.
+What actions should I take?
 """)
         return [system_message, human_message]
         
     def _create_error_recovery_prompt(self, state: AgentGraphState) -> List:
         """Create prompt for error recovery."""
-        system_message = SystemMessage(content="""
-You are helping recover from an error. Analyze the error and determine the best recovery strategy.
-
-Respond with JSON containing:
-- should_retry: Boolean indicating if we should retry
-- error_message: User-friendly error message
-- suggested_action: What the user should do
-""")
+        system_message = _SYS_RECOVER
         human_message = HumanMessage(content=f"""
-Error: {state['last_error']}
-Error count: {state['error_count']}
 Last action: {state.get('last_decision')}
+Error count: {state['error_count']}
+Error: {state['last_error']}
 
 How should we recover from this error?
 """)
@@ -312,18 +505,13 @@ How should we recover from this error?
         
     def _create_response_prompt(self, state: AgentGraphState) -> List:
         """Create prompt for response generation."""
-        system_message = SystemMessage(content="""
-Generate a helpful, friendly response to the user based on the conversation and any actions taken.
-
-Be concise, clear, and professional. If actions were taken, summarize what was done.
-If information was retrieved, present it in a useful format.
-""")
+        system_message = _SYS_RESPOND
         tool_results = state.get("tool_results", {})
         last_decision = state.get("last_decision")
         human_message = HumanMessage(content=f"""
-User message: {state['current_message']}
 Actions taken: {last_decision}
 Tool results: {tool_results}
+User message: {state['current_message']}
 
 Generate an appropriate response.
 """)
@@ -332,50 +520,51 @@ Generate an appropriate response.
     def _parse_analysis_response(self, response: str) -> Dict[str, Any]:
         """Parse analysis response from LLM."""
         try:
-            import json
-            return json.loads(response)
-        except:
-            return {"intent": "unknown", "requires_action": False, "urgency": "low"}
+            match = _JSON_RE.search(response.encode("utf-8"))
+            return orjson.loads(match.group(0)) if match else _DEFAULT_ANALYSIS
+        except (orjson.JSONDecodeError, AttributeError):
+            return _DEFAULT_ANALYSIS
             
     def _parse_decision_response(self, response, state: AgentGraphState) -> AgentDecision:
         """Parse decision response from LLM."""
         actions = []
         if hasattr(response, 'additional_kwargs') and 'function_call' in response.additional_kwargs:
             function_call = response.additional_kwargs['function_call']
+            parameters_raw = function_call['arguments'].encode("utf-8")
             action = AgentAction(
-                action_type="tool_call",
+                action_id=token_hex(8),
+                action_type=AgentActionType.TOOL_CALL,
+                description=response.content or "Tool execution requested",
                 tool_name=function_call['name'],
-                parameters=json.loads(function_call['arguments']),
-                reasoning=response.content or "Tool execution requested"
+                parameters=orjson.loads(parameters_raw),
+                parameters_raw=parameters_raw
             )
             actions.append(action)
         elif response.content:
             action = AgentAction(
-                action_type="send_message",
-                parameters={"message": response.content},
-                reasoning="Direct response to user"
+                action_id=token_hex(8),
+                action_type=AgentActionType.SEND_MESSAGE,
+                description="Direct response to user",
+                parameters={"message": response.content}
             )
             actions.append(action)
         return AgentDecision(
-            decision_type="action_sequence",
-            confidence=0.8,
+            decision_id=token_hex(8),
+            decision_type=AgentDecisionType.IMMEDIATE,
+            context=state["current_message"] or "",
             reasoning=response.content or "Automated decision",
-            actions=actions,
-            metadata={}
+            confidence=ConfidenceLevel.HIGH,
+            actions=actions
         )
         
     def _parse_recovery_response(self, response: str) -> Dict[str, Any]:
         """Parse error recovery response."""
         try:
-            import json
-            return json.loads(response)
-        except:
-            return {
-                "should_retry": False,
-                "error_message": "I encountered an error. Please try again.",
-                "suggested_action": "retry"
-            }
+            match = _JSON_RE.search(response.encode("utf-8"))
+            return orjson.loads(match.group(0)) if match else _DEFAULT_RECOVERY
+        except (orjson.JSONDecodeError, AttributeError):
+            return _DEFAULT_RECOVERY
             
     def get_compiled_graph(self):
-        """Get the compiled LangGraph."""
-        return self.graph
\ No newline at end of file
+        """Get the compiled LangGraph bound to this builder."""
+        return self._bound_graph
\ No newline at end of file
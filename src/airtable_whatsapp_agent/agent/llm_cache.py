@@ -0,0 +1,164 @@
+"""
+LLM response caching for the autonomous agent.
+Avoids repeated LLM round-trips for equivalent prompts.
+"""
+
+import hashlib
+import json
+import logging
+import math
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+import redis.asyncio as redis
+from langchain.schema import AIMessage
+
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticLLMCache:
+    """Caches parsed LLM results keyed by embedding similarity of the input message."""
+
+    def __init__(self, embeddings: Any, threshold: float = 0.92, max_scopes: int = 256, max_entries_per_scope: int = 32):
+        """Initialize semantic cache."""
+        self.logger = logging.getLogger(__name__)
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.max_scopes = max_scopes
+        self.max_entries_per_scope = max_entries_per_scope
+        self._scopes: "OrderedDict[Hashable, List[Tuple[List[float], Any]]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_scope(available_tools: Sequence[str], recent_context: str) -> Tuple[Tuple[str, ...], str]:
+        """Build the cache scope so answers never leak across tool permissions or conversations."""
+        history_hash = hashlib.sha256(recent_context.encode("utf-8")).hexdigest()
+        return tuple(available_tools), history_hash
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed and L2-normalize text so similarity is a plain dot product."""
+        vector = await self.embeddings.aembed_query(text)
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def has_entries(self, scope: Hashable) -> bool:
+        """Whether a lookup in scope could hit at all."""
+        return bool(self._scopes.get(scope))
+
+    def get(self, embedding: List[float], scope: Hashable, threshold: Optional[float] = None) -> Optional[Any]:
+        """Return the cached value of the most similar entry above threshold."""
+        entries = self._scopes.get(scope)
+        if entries:
+            limit = self.threshold if threshold is None else threshold
+            best_score, best_value = limit, None
+            for vector, value in entries:
+                score = sum(a * b for a, b in zip(embedding, vector))
+                if score >= best_score:
+                    best_score, best_value = score, value
+            if best_value is not None:
+                self._scopes.move_to_end(scope)
+                self.stats["hits"] += 1
+                return best_value
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, embedding: List[float], scope: Hashable, value: Any) -> None:
+        """Store a value for an embedding within a scope."""
+        entries = self._scopes.setdefault(scope, [])
+        self._scopes.move_to_end(scope)
+        entries.append((embedding, value))
+        if len(entries) > self.max_entries_per_scope:
+            del entries[0]
+        while len(self._scopes) > self.max_scopes:
+            self._scopes.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        self._scopes.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache hit/miss statistics."""
+        return {**self.stats, "scopes": len(self._scopes)}
+
+
+class CachedChatOpenAI:
+    """Exact-match cache in front of a chat model for deterministic (temperature 0) calls."""
+
+    def __init__(self, llm: Any, redis_client: Optional[redis.Redis] = None, ttl_seconds: int = 3600, max_local_entries: int = 1024):
+        """Initialize cached chat model adapter."""
+        self.logger = logging.getLogger(__name__)
+        self.llm = llm
+        self.redis_client = redis_client
+        self.ttl_seconds = ttl_seconds
+        self.max_local_entries = max_local_entries
+        self._local: "OrderedDict[str, str]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    @property
+    def cacheable(self) -> bool:
+        """Only deterministic calls are safe to replay."""
+        return not self.llm.temperature
+
+    def cache_key(self, messages: Sequence[Any], functions: Optional[Sequence[Dict[str, Any]]] = None) -> str:
+        """Build a SHA256 key over model, messages and tool names."""
+        payload = {
+            "model": self.llm.model_name,
+            "temperature": self.llm.temperature,
+            "messages": [[message.type, message.content] for message in messages],
+            "tools": sorted(function["name"] for function in functions or [])
+        }
+        return "llm_cache:" + hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    async def ainvoke(self, messages: Sequence[Any], **kwargs: Any) -> Any:
+        """Invoke the model, serving identical deterministic prompts from cache."""
+        if not self.cacheable:
+            return await self.llm.ainvoke(messages, **kwargs)
+        key = self.cache_key(messages, kwargs.get("functions"))
+        cached = await self._get(key)
+        if cached is not None:
+            self.stats["hits"] += 1
+            return AIMessage(content=cached)
+        self.stats["misses"] += 1
+        response = await self.llm.ainvoke(messages, **kwargs)
+        if not response.additional_kwargs:
+            await self._set(key, response.content)
+        return response
+
+    async def _get(self, key: str) -> Optional[str]:
+        """Read a cached completion from the local tier, then Redis."""
+        if key in self._local:
+            self._local.move_to_end(key)
+            return self._local[key]
+        if not self.redis_client:
+            return None
+        try:
+            value = await self.redis_client.get(key)
+        except Exception as e:
+            self.logger.debug("LLM cache read failed: %s", e)
+            return None
+        if value is None:
+            return None
+        content = value.decode("utf-8") if isinstance(value, bytes) else value
+        self._remember(key, content)
+        return content
+
+    async def _set(self, key: str, content: str) -> None:
+        """Write a completion to both cache tiers."""
+        self._remember(key, content)
+        if not self.redis_client:
+            return
+        try:
+            await self.redis_client.set(key, content, ex=self.ttl_seconds)
+        except Exception as e:
+            self.logger.debug("LLM cache write failed: %s", e)
+
+    def _remember(self, key: str, content: str) -> None:
+        """Store a completion in the bounded in-process tier."""
+        self._local[key] = content
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_local_entries:
+            self._local.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache hit/miss statistics."""
+        return {**self.stats, "local_entries": len(self._local)}
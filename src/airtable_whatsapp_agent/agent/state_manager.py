@@ -2,32 +2,104 @@
 State management for the autonomous agent using LangGraph.
 """
 
+import asyncio
+import itertools
 import logging
-from typing import Any, Dict, List, Optional, TypedDict
-from datetime import datetime
-from ..models.agent import AgentState, AgentAction, AgentDecision, ConversationContext, TaskStatus
+import sys
+import time
+import weakref
+from collections import ChainMap, OrderedDict, deque, namedtuple
+from types import MappingProxyType
+from typing import Any, Callable, ChainMap as ChainMapType, Deque, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple, TypedDict
+from datetime import datetime, timezone
+import psutil
+from .state_store import StateBackend
+from ..models.agent import AgentStateType, AgentAction, AgentActionType, AgentDecision, ConversationContext, TaskStatus
 
 
 logger = logging.getLogger(__name__)
 
+RECENT_CONTEXT_SIZE = 5
+CONTEXT_HISTORY_SIZE = 10
+MAX_HISTORY = 100
+MAX_ACTIVE_SESSIONS = 1000
+RSS_HIGH_WATERMARK = 0.8
+# Reading RSS is a syscall plus /proc parsing, so session creation probes it at most this often
+RSS_PROBE_INTERVAL_S = 5.0
+
+
+# Wire form of a history entry; serialized as a JSON array rather than an object
+Msg = namedtuple("Msg", "timestamp sender message type metadata")
+
+# Shared read-only metadata for the common case of messages without any
+_EMPTY_DICT: Mapping[str, Any] = MappingProxyType({})
+
+
+class HistoryStore:
+    """Conversation history kept as parallel columns; entry dicts are only built for the rows read."""
+
+    __slots__ = ("maxlen", "timestamps", "senders", "messages", "types", "meta")
+
+    def __init__(self, maxlen: Optional[int] = None):
+        """Initialize empty history, keeping at most maxlen of the newest entries."""
+        self.maxlen = maxlen
+        self.timestamps: Deque[int] = deque(maxlen=maxlen)
+        self.senders: Deque[str] = deque(maxlen=maxlen)
+        self.messages: Deque[str] = deque(maxlen=maxlen)
+        self.types: Deque[str] = deque(maxlen=maxlen)
+        self.meta: Deque[Mapping[str, Any]] = deque(maxlen=maxlen)
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def append(self, ts: int, sender: str, message: str, message_type: str, meta: Mapping[str, Any]) -> None:
+        """Append one entry (ts in time.time_ns() units); the columns drop the oldest beyond maxlen."""
+        self.timestamps.append(ts)
+        self.senders.append(sender)
+        self.messages.append(message)
+        self.types.append(message_type)
+        self.meta.append(meta)
+
+    def extend_rows(self, rows: Iterable[Any]) -> None:
+        """Append stored rows: (ts, sender, message, type, meta) arrays, or legacy entry dicts."""
+        for row in rows:
+            if isinstance(row, dict):
+                self.append(_parse_ts(row.get("timestamp")), row.get("sender", ""), row.get("message", ""), row.get("type", "text"), row.get("metadata") or _EMPTY_DICT)
+            else:
+                self.append(*row)
+                
+    def row(self, index: int) -> Msg:
+        """A single entry as a compact Msg tuple."""
+        return Msg(self.timestamps[index], self.senders[index], self.messages[index], self.types[index], self.meta[index])
+
+    def entry(self, index: int) -> Dict[str, Any]:
+        """Materialize a single entry as a dict."""
+        return {
+            "timestamp": format_ts(self.timestamps[index]),
+            "sender": self.senders[index],
+            "message": self.messages[index],
+            "type": self.types[index],
+            "metadata": self.meta[index]
+        }
+
 
 class AgentGraphState(TypedDict):
     """State structure for LangGraph agent."""
     # Core state
-    current_state: AgentState
+    current_state: AgentStateType
     session_id: str
     user_phone: str
     # Conversation context
-    conversation_history: List[Dict[str, Any]]
+    conversation_history: HistoryStore
     current_message: Optional[str]
     message_type: Optional[str]
     # Task management
     current_task: Optional[str]
     task_status: TaskStatus
-    task_context: Dict[str, Any]
+    task_context: ChainMapType[str, Any]
     # Decision making
     last_decision: Optional[AgentDecision]
-    pending_actions: List[AgentAction]
+    pending_actions: Deque[AgentAction]
     # Tool usage
     available_tools: List[str]
     tool_results: Dict[str, Any]
@@ -36,37 +108,124 @@ class AgentGraphState(TypedDict):
     last_error: Optional[str]
     # Metadata
     created_at: datetime
-    updated_at: datetime
+    updated_at_ns: int
     metadata: Dict[str, Any]
 
 
+_STATE_KEYS = frozenset(map(sys.intern, AgentGraphState.__annotations__))
+
+
+def format_ts(ns: int) -> str:
+    """Format a time.time_ns() timestamp as an ISO-8601 UTC string."""
+    return datetime.fromtimestamp(ns / 1e9, tz=timezone.utc).isoformat()
+
+
+def _parse_ts(value: Optional[str]) -> int:
+    """Inverse of format_ts; naive timestamps are taken as UTC."""
+    if not value:
+        return time.time_ns()
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1_000_000) * 1000
+
+def _task_context(base: Optional[Mapping[str, Any]] = None) -> ChainMapType[str, Any]:
+    """Copy-on-write task context: writes land in a small override map over a read-only base."""
+    return ChainMap({}, MappingProxyType(dict(base)) if base else _EMPTY_DICT)
+
+
+def _build_summary(session_id: str, user_phone: str, current_state: AgentStateType, message_count: int, current_task: Optional[str], task_status: TaskStatus, pending_actions: int, error_count: int, created_at: datetime, updated_at_ns: int) -> Dict[str, Any]:
+    """Session summary for a snapshot of scalar state."""
+    return {
+        "session_id": session_id,
+        "user_phone": user_phone,
+        "current_state": current_state.value,
+        "message_count": message_count,
+        "current_task": current_task,
+        "task_status": task_status.value,
+        "pending_actions": pending_actions,
+        "error_count": error_count,
+        "created_at": created_at.isoformat(),
+        "updated_at": format_ts(updated_at_ns)
+    }
+
+
+_VALID_TRANSITIONS: Dict[AgentStateType, FrozenSet[AgentStateType]] = {
+    AgentStateType.IDLE: frozenset({
+        AgentStateType.PROCESSING,
+        AgentStateType.ERROR
+    }),
+    AgentStateType.PROCESSING: frozenset({
+        AgentStateType.EXECUTING_TASK,
+        AgentStateType.WAITING_FOR_INPUT,
+        AgentStateType.IDLE,
+        AgentStateType.ERROR
+    }),
+    AgentStateType.EXECUTING_TASK: frozenset({
+        AgentStateType.PROCESSING,
+        AgentStateType.WAITING_FOR_INPUT,
+        AgentStateType.IDLE,
+        AgentStateType.ERROR
+    }),
+    AgentStateType.WAITING_FOR_INPUT: frozenset({
+        AgentStateType.PROCESSING,
+        AgentStateType.IDLE,
+        AgentStateType.ERROR
+    }),
+    AgentStateType.ERROR: frozenset({
+        AgentStateType.IDLE,
+        AgentStateType.PROCESSING
+    })
+}
+_NO_TRANSITIONS: FrozenSet[AgentStateType] = frozenset()
+
+
 class StateManager:
     """Manages agent state throughout conversation and task execution."""
     
-    def __init__(self):
+    def __init__(self, backend: Optional[StateBackend] = None, max_history: int = MAX_HISTORY, max_active_sessions: int = MAX_ACTIVE_SESSIONS, rss_budget_bytes: Optional[int] = None):
         """Initialize state manager."""
         self.logger = logging.getLogger(__name__)
-        self.active_states: Dict[str, AgentGraphState] = {}
+        self.backend = backend
+        self.max_history = max_history
+        self.max_active_sessions = max_active_sessions
+        self.rss_budget_bytes = rss_budget_bytes
+        self._next_rss_probe = 0.0
+        # Least recently touched sessions first; cold ones are persisted and evicted
+        self.active_states: "OrderedDict[str, AgentGraphState]" = OrderedDict()
+        self._evicting: Set[str] = set()
+        self._dirty: Set[str] = set()
+        self._dirty_fields: Dict[str, Set[str]] = {}
+        self._pending_history: Dict[str, List[Msg]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # Serializes graph runs per session; a lock is dropped once no run holds or awaits it
+        self._run_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        # Strong references keep in-flight evictions from being garbage collected mid-write
+        self._evict_tasks: Set[asyncio.Task] = set()
+        self._recent_lines: Dict[str, Deque[str]] = {}
+        self._recent_context: Dict[str, str] = {}
+        # Last summary per session with the state snapshot it was built from
+        self._summaries: Dict[str, Tuple[tuple, Dict[str, Any]]] = {}
         
     def create_initial_state(self, session_id: str, user_phone: str, initial_message: Optional[str] = None, context: Optional[Dict[str, Any]] = None) -> AgentGraphState:
         """Create initial agent state."""
         now = datetime.utcnow()
         state = AgentGraphState(
             # Core state
-            current_state=AgentState.IDLE,
+            current_state=AgentStateType.IDLE,
             session_id=session_id,
             user_phone=user_phone,
             # Conversation context
-            conversation_history=[],
+            conversation_history=HistoryStore(maxlen=self.max_history),
             current_message=initial_message,
             message_type="text" if initial_message else None,
             # Task management
             current_task=None,
             task_status=TaskStatus.PENDING,
-            task_context={},
+            task_context=_task_context(),
             # Decision making
             last_decision=None,
-            pending_actions=[],
+            pending_actions=deque(),
             # Tool usage
             available_tools=[],
             tool_results={},
@@ -75,17 +234,23 @@ class StateManager:
             last_error=None,
             # Metadata
             created_at=now,
-            updated_at=now,
+            updated_at_ns=time.time_ns(),
             metadata=context or {}
         )
         # Store active state
         self.active_states[session_id] = state
+        self.active_states.move_to_end(session_id)
+        self._evict_cold_sessions()
+        self._mark_dirty(session_id, *state.keys())
         self.logger.info(f"Created initial state for session {session_id}")
         return state
         
     def get_state(self, session_id: str) -> Optional[AgentGraphState]:
-        """Get current state for session."""
-        return self.active_states.get(session_id)
+        """Get current state for session (in memory only; see restore_state)."""
+        state = self.active_states.get(session_id)
+        if state:
+            self._mark_recent(session_id)
+        return state
         
     def update_state(self, session_id: str, updates: Dict[str, Any]) -> Optional[AgentGraphState]:
         """Update agent state."""
@@ -93,15 +258,30 @@ class StateManager:
         if not state:
             self.logger.warning(f"No state found for session {session_id}")
             return None
+        setitem = state.__setitem__
+        changed = []
         for key, value in updates.items():
-            if key in state:
-                state[key] = value
+            if key in _STATE_KEYS:
+                setitem(key, value)
+                changed.append(key)
             else:
                 self.logger.warning(f"Unknown state key: {key}")
-        state["updated_at"] = datetime.utcnow()
+        self._mark_dirty(session_id, *changed)
+        self._touch(session_id)
         return state
         
-    def transition_state(self, session_id: str, new_state: AgentState, context: Optional[Dict[str, Any]] = None) -> bool:
+    def mutate_state(self, session_id: str, mutate: Callable[[AgentGraphState], None], *fields: str) -> Optional[AgentGraphState]:
+        """Apply an in-place mutation to a session's state and mark the named fields dirty.
+        The callback runs without yielding to the loop, so no other coroutine sees a half-applied change."""
+        state = self.active_states.get(session_id)
+        if not state:
+            return None
+        mutate(state)
+        self._mark_dirty(session_id, *fields)
+        self._touch(session_id)
+        return state
+        
+    def transition_state(self, session_id: str, new_state: AgentStateType, context: Optional[Dict[str, Any]] = None) -> bool:
         """Transition agent to new state."""
         state = self.active_states.get(session_id)
         if not state:
@@ -111,9 +291,11 @@ class StateManager:
             self.logger.warning(f"Invalid state transition: {old_state} -> {new_state}")
             return False
         state["current_state"] = new_state
-        state["updated_at"] = datetime.utcnow()
+        self._mark_dirty(session_id, "current_state")
+        self._touch(session_id)
         if context:
             state["metadata"].update(context)
+            self._mark_dirty(session_id, "metadata")
         self.logger.info(f"State transition: {old_state} -> {new_state} for session {session_id}")
         return True
         
@@ -122,17 +304,24 @@ class StateManager:
         state = self.active_states.get(session_id)
         if not state:
             return False
-        message_entry = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "sender": sender,
-            "message": message,
-            "type": message_type,
-            "metadata": metadata or {}
-        }
-        state["conversation_history"].append(message_entry)
-        state["updated_at"] = datetime.utcnow()
+        now = time.time_ns()
+        history = state["conversation_history"]
+        history.append(now, sender, message, message_type, metadata or _EMPTY_DICT)
+        self._touch(session_id)
+        if self.backend:
+            self._pending_history.setdefault(session_id, []).append(history.row(-1))
+        self._recent_lines.setdefault(session_id, deque(maxlen=RECENT_CONTEXT_SIZE)).append(f"{sender}: {message}")
+        self._recent_context.pop(session_id, None)
         return True
         
+    def get_recent_context(self, session_id: str) -> str:
+        """Get the last few messages formatted as prompt lines."""
+        context = self._recent_context.get(session_id)
+        if context is None:
+            context = "\n".join(self._recent_lines.get(session_id, ()))
+            self._recent_context[session_id] = context
+        return context
+        
     def set_current_task(self, session_id: str, task_description: str, task_context: Optional[Dict[str, Any]] = None) -> bool:
         """Set current task for agent."""
         state = self.active_states.get(session_id)
@@ -140,8 +329,9 @@ class StateManager:
             return False
         state["current_task"] = task_description
         state["task_status"] = TaskStatus.IN_PROGRESS
-        state["task_context"] = task_context or {}
-        state["updated_at"] = datetime.utcnow()
+        state["task_context"] = _task_context(task_context)
+        self._mark_dirty(session_id, "current_task", "task_status", "task_context")
+        self._touch(session_id)
         self.logger.info(f"Set task for session {session_id}: {task_description}")
         return True
         
@@ -151,12 +341,13 @@ class StateManager:
         if not state:
             return False
         state["task_status"] = status
-        state["updated_at"] = datetime.utcnow()
         if result:
             state["task_context"]["result"] = result
         if status == TaskStatus.COMPLETED:
             state["current_task"] = None
-            state["task_context"] = {}
+            state["task_context"] = _task_context()
+        self._mark_dirty(session_id, "task_status", "task_context", "current_task")
+        self._touch(session_id)
         return True
         
     def add_pending_action(self, session_id: str, action: AgentAction) -> bool:
@@ -165,7 +356,7 @@ class StateManager:
         if not state:
             return False
         state["pending_actions"].append(action)
-        state["updated_at"] = datetime.utcnow()
+        self._touch(session_id)
         return True
         
     def get_next_action(self, session_id: str) -> Optional[AgentAction]:
@@ -173,7 +364,20 @@ class StateManager:
         state = self.active_states.get(session_id)
         if not state or not state["pending_actions"]:
             return None
-        return state["pending_actions"].pop(0)
+        return state["pending_actions"].popleft()
+        
+    def drain_independent_actions(self, session_id: str, tool_registry: Any) -> List[AgentAction]:
+        """Pop the leading run of pending actions that can execute concurrently."""
+        state = self.active_states.get(session_id)
+        if not state or not state["pending_actions"]:
+            return []
+        pending = state["pending_actions"]
+        batch = [pending.popleft()]
+        if batch[0].action_type != AgentActionType.TOOL_CALL:
+            return batch
+        while pending and all(tool_registry.actions_are_independent(action, pending[0]) for action in batch):
+            batch.append(pending.popleft())
+        return batch
         
     def record_decision(self, session_id: str, decision: AgentDecision) -> bool:
         """Record agent decision."""
@@ -181,7 +385,7 @@ class StateManager:
         if not state:
             return False
         state["last_decision"] = decision
-        state["updated_at"] = datetime.utcnow()
+        self._touch(session_id)
         return True
         
     def record_tool_result(self, session_id: str, tool_name: str, result: Any, success: bool = True) -> bool:
@@ -189,8 +393,9 @@ class StateManager:
         state = self.active_states.get(session_id)
         if not state:
             return False
-        state["tool_results"][tool_name] = {"result": result, "success": success, "timestamp": datetime.utcnow().isoformat()}
-        state["updated_at"] = datetime.utcnow()
+        state["tool_results"][sys.intern(tool_name)] = {"result": result, "success": success, "ts_ns": time.time_ns()}
+        self._mark_dirty(session_id, "tool_results")
+        self._touch(session_id)
         return True
         
     def record_error(self, session_id: str, error_message: str, error_context: Optional[Dict[str, Any]] = None) -> bool:
@@ -200,9 +405,11 @@ class StateManager:
             return False
         state["error_count"] += 1
         state["last_error"] = error_message
-        state["updated_at"] = datetime.utcnow()
+        self._mark_dirty(session_id, "error_count", "last_error")
+        self._touch(session_id)
         if error_context:
             state["metadata"]["last_error_context"] = error_context
+            self._mark_dirty(session_id, "metadata")
         self.logger.error(f"Error recorded for session {session_id}: {error_message}")
         return True
         
@@ -213,9 +420,11 @@ class StateManager:
             return False
         state["error_count"] = 0
         state["last_error"] = None
-        state["updated_at"] = datetime.utcnow()
+        self._mark_dirty(session_id, "error_count", "last_error")
+        self._touch(session_id)
         if "last_error_context" in state["metadata"]:
             del state["metadata"]["last_error_context"]
+            self._mark_dirty(session_id, "metadata")
         return True
         
     def get_conversation_context(self, session_id: str) -> Optional[ConversationContext]:
@@ -223,7 +432,8 @@ class StateManager:
         state = self.active_states.get(session_id)
         if not state:
             return None
-        recent_history = state["conversation_history"][-10:]
+        history = state["conversation_history"]
+        recent_history = [history.entry(index) for index in range(max(len(history) - CONTEXT_HISTORY_SIZE, 0), len(history))]
         return ConversationContext(
             session_id=session_id,
             user_phone=state["user_phone"],
@@ -237,62 +447,170 @@ class StateManager:
         
     def cleanup_session(self, session_id: str) -> bool:
         """Clean up session state."""
+        self._recent_lines.pop(session_id, None)
+        self._recent_context.pop(session_id, None)
+        self._summaries.pop(session_id, None)
+        self._evicting.discard(session_id)
+        self._dirty.discard(session_id)
+        self._dirty_fields.pop(session_id, None)
+        self._pending_history.pop(session_id, None)
+        self._locks.pop(session_id, None)
         if session_id in self.active_states:
             del self.active_states[session_id]
             self.logger.info(f"Cleaned up session {session_id}")
             return True
         return False
         
+    def session_lock(self, session_id: str) -> asyncio.Lock:
+        """Lock guarding compound operations on a session that span await points."""
+        return self._locks.setdefault(session_id, asyncio.Lock())
+        
+    def run_lock(self, session_id: str) -> asyncio.Lock:
+        """Lock held for the duration of a graph run on a session."""
+        lock = self._run_locks.get(session_id)
+        if lock is None:
+            lock = self._run_locks[session_id] = asyncio.Lock()
+        return lock
+        
+    def _is_busy(self, session_id: str) -> bool:
+        """Whether a graph run, persist or restore currently holds the session."""
+        run_lock, lock = self._run_locks.get(session_id), self._locks.get(session_id)
+        return bool(run_lock and run_lock.locked()) or bool(lock and lock.locked())
+        
+    def _touch(self, session_id: str) -> None:
+        """Note that a session changed; updated_at_ns is stamped once per node by commit()."""
+        self._mark_recent(session_id)
+        self._dirty.add(session_id)
+        
+    def commit(self, session_id: str) -> None:
+        """Stamp updated_at_ns once for all mutations since the last commit."""
+        if session_id not in self._dirty:
+            return
+        self._dirty.discard(session_id)
+        state = self.active_states.get(session_id)
+        if state:
+            state["updated_at_ns"] = time.time_ns()
+            self._mark_dirty(session_id, "updated_at_ns")
+            
+    def _mark_recent(self, session_id: str) -> None:
+        """Move a session to the hot end of the LRU order."""
+        self.active_states.move_to_end(session_id)
+        self._evicting.discard(session_id)
+        
+    def _evict_cold_sessions(self) -> None:
+        """Persist and drop least recently touched sessions while over the session or RSS budget."""
+        # Without a backend an evicted session would be lost, so nothing is evicted
+        if not self.backend:
+            return
+        excess = len(self.active_states) - len(self._evicting) - self.max_active_sessions
+        if excess <= 0 and self.rss_budget_bytes is not None and self._rss_over_budget():
+            # RSS only falls once evictions complete, so take one session per check
+            excess = 1
+        if excess <= 0:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        # The newest session is never a candidate, nor is one that a run or a write is using
+        cold = (session_id for session_id in itertools.islice(self.active_states, len(self.active_states) - 1) if session_id not in self._evicting and not self._is_busy(session_id))
+        for session_id in itertools.islice(cold, excess):
+            self._evicting.add(session_id)
+            task = loop.create_task(self._evict_session(session_id))
+            self._evict_tasks.add(task)
+            task.add_done_callback(self._evict_tasks.discard)
+            
+    def _rss_over_budget(self) -> bool:
+        """Whether RSS is above the high watermark; between probes it reports False."""
+        now = time.monotonic()
+        if now < self._next_rss_probe:
+            return False
+        self._next_rss_probe = now + RSS_PROBE_INTERVAL_S
+        return psutil.Process().memory_info().rss > self.rss_budget_bytes * RSS_HIGH_WATERMARK
+            
+    async def _evict_session(self, session_id: str) -> None:
+        """Write a cold session to the backend and drop it unless it was touched or picked up by a run meanwhile."""
+        saved = await self.persist(session_id)
+        if saved and session_id in self._evicting and not self._is_busy(session_id):
+            self.cleanup_session(session_id)
+            self.logger.info(f"Evicted cold session {session_id}")
+        self._evicting.discard(session_id)
+        
+    def _mark_dirty(self, session_id: str, *fields: str) -> None:
+        """Remember fields that changed since the session was last persisted."""
+        if self.backend:
+            self._dirty_fields.setdefault(session_id, set()).update(fields)
+            
+    async def persist(self, session_id: str, *fields: str) -> bool:
+        """Write changed fields (plus any named fields mutated in place) and new history to the backend."""
+        state = self.active_states.get(session_id)
+        if not self.backend or not state:
+            return False
+        self.commit(session_id)
+        # Serialized so history batches reach Redis in the order they were taken
+        async with self.session_lock(session_id):
+            dirty = self._dirty_fields.pop(session_id, set())
+            dirty.update(fields)
+            history = self._pending_history.pop(session_id, [])
+            return await self.backend.save(session_id, {key: state[key] for key in dirty if key in state}, history)
+        
+    async def restore_state(self, session_id: str) -> Optional[AgentGraphState]:
+        """Get session state, rehydrating it from the backend when it is not held in memory."""
+        state = self.active_states.get(session_id)
+        if state or not self.backend:
+            if state:
+                self._mark_recent(session_id)
+            return state
+        async with self.session_lock(session_id):
+            # Another coroutine may have restored the session while this one waited
+            state = self.active_states.get(session_id)
+            if state:
+                return state
+            stored = await self.backend.load(session_id)
+            if not stored:
+                return None
+            return self._rehydrate(session_id, stored)
+            
+    def _rehydrate(self, session_id: str, stored: Dict[str, Any]) -> AgentGraphState:
+        """Rebuild in-memory state from a stored session."""
+        state = self.create_initial_state(session_id, stored.get("user_phone", ""))
+        rows = stored.pop("conversation_history", [])
+        state.update({key: value for key, value in stored.items() if key in state})
+        state["task_context"] = _task_context(state["task_context"])
+        history = state["conversation_history"]
+        history.extend_rows(rows)
+        self._dirty_fields.pop(session_id, None)
+        recent = self._recent_lines.setdefault(session_id, deque(maxlen=RECENT_CONTEXT_SIZE))
+        # The deque keeps only the last RECENT_CONTEXT_SIZE lines
+        recent.extend(f"{sender}: {message}" for sender, message in zip(history.senders, history.messages))
+        self.logger.info(f"Restored state for session {session_id}")
+        return state
+        
     def get_active_sessions(self) -> List[str]:
         """Get list of active session IDs."""
         return list(self.active_states.keys())
         
     def get_session_summary(self, session_id: str) -> Optional[Dict[str, Any]]:
-        """Get summary of session state."""
+        """Get summary of session state; rebuilt only when the session changed since the last call."""
         state = self.active_states.get(session_id)
         if not state:
             return None
-        return {
-            "session_id": session_id,
-            "user_phone": state["user_phone"],
-            "current_state": state["current_state"].value,
-            "message_count": len(state["conversation_history"]),
-            "current_task": state["current_task"],
-            "task_status": state["task_status"].value,
-            "pending_actions": len(state["pending_actions"]),
-            "error_count": state["error_count"],
-            "created_at": state["created_at"].isoformat(),
-            "updated_at": state["updated_at"].isoformat()
-        }
+        snapshot = (
+            state["user_phone"],
+            state["current_state"],
+            len(state["conversation_history"]),
+            state["current_task"],
+            state["task_status"],
+            len(state["pending_actions"]),
+            state["error_count"],
+            state["created_at"],
+            state["updated_at_ns"]
+        )
+        cached = self._summaries.get(session_id)
+        if cached is None or cached[0] != snapshot:
+            cached = self._summaries[session_id] = (snapshot, _build_summary(session_id, *snapshot))
+        return dict(cached[1])
         
-    def _is_valid_transition(self, from_state: AgentState, to_state: AgentState) -> bool:
+    def _is_valid_transition(self, from_state: AgentStateType, to_state: AgentStateType) -> bool:
         """Validate state transition."""
-        valid_transitions = {
-            AgentState.IDLE: [
-                AgentState.PROCESSING,
-                AgentState.ERROR
-            ],
-            AgentState.PROCESSING: [
-                AgentState.EXECUTING_TASK,
-                AgentState.WAITING_FOR_INPUT,
-                AgentState.IDLE,
-                AgentState.ERROR
-            ],
-            AgentState.EXECUTING_TASK: [
-                AgentState.PROCESSING,
-                AgentState.WAITING_FOR_INPUT,
-                AgentState.IDLE,
-                AgentState.ERROR
-            ],
-            AgentState.WAITING_FOR_INPUT: [
-                AgentState.PROCESSING,
-                AgentState.IDLE,
-                AgentState.ERROR
-            ],
-            AgentState.ERROR: [
-                AgentState.IDLE,
-                AgentState.PROCESSING
-            ]
-        }
-        allowed_states = valid_transitions.get(from_state, [])
-        return to_state in allowed_states
\ No newline at end of file
+        return to_state in _VALID_TRANSITIONS.get(from_state, _NO_TRANSITIONS)
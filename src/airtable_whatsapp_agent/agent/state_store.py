@@ -0,0 +1,239 @@
+"""
+Persistent session storage for the autonomous agent.
+Keeps agent state in Redis (shared across replicas) or SQLite (single host) so sessions survive restarts.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import time
+from collections import ChainMap, deque
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+import orjson
+import redis.asyncio as redis
+from pydantic import BaseModel
+from ..models.agent import AgentStateType, TaskStatus
+
+
+logger = logging.getLogger(__name__)
+
+# How often SQLite saves also sweep out sessions past their TTL
+PRUNE_INTERVAL_SECONDS = 300
+
+# Fields rebuilt per turn by the graph; persisting them would require round-tripping pydantic models
+TRANSIENT_FIELDS = frozenset({"pending_actions", "last_decision", "conversation_history"})
+
+_FIELD_DECODERS: Dict[str, Callable[[Any], Any]] = {
+    "current_state": AgentStateType,
+    "task_status": TaskStatus,
+    "created_at": datetime.fromisoformat,
+}
+
+
+def _encode_default(value: Any) -> Any:
+    """Serialize values orjson does not handle natively."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (deque, set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, (MappingProxyType, ChainMap)):
+        return dict(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def encode_value(value: Any) -> bytes:
+    """Encode a state value as JSON (datetimes as ISO strings, enums by value)."""
+    return orjson.dumps(value, default=_encode_default)
+
+
+def _decode_fields(raw_fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply per-field decoders to JSON-decoded state fields."""
+    fields: Dict[str, Any] = {}
+    for key, value in raw_fields.items():
+        decoder = _FIELD_DECODERS.get(key)
+        fields[key] = decoder(value) if decoder and value is not None else value
+    return fields
+
+
+class RedisStateBackend:
+    """Redis hash-per-session store with a capped list of history rows (JSON arrays)."""
+
+    def __init__(self, redis_client: redis.Redis, ttl_seconds: int = 1800, history_limit: int = 100, key_prefix: str = "session:"):
+        """Initialize Redis state backend."""
+        self.logger = logging.getLogger(__name__)
+        self.redis_client = redis_client
+        self.ttl_seconds = ttl_seconds
+        self.history_limit = history_limit
+        self.key_prefix = key_prefix
+
+    def _state_key(self, session_id: str) -> str:
+        return f"{self.key_prefix}{session_id}"
+
+    def _history_key(self, session_id: str) -> str:
+        return f"{self.key_prefix}{session_id}:history"
+
+    async def save(self, session_id: str, fields: Dict[str, Any], history: Iterable[Sequence[Any]] = ()) -> bool:
+        """Write changed fields and new history rows in a single pipeline."""
+        fields = {key: encode_value(value) for key, value in fields.items() if key not in TRANSIENT_FIELDS}
+        history = [encode_value(entry) for entry in history]
+        if not fields and not history:
+            return True
+        state_key, history_key = self._state_key(session_id), self._history_key(session_id)
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                if fields:
+                    pipe.hset(state_key, mapping=fields)
+                if history:
+                    pipe.rpush(history_key, *history)
+                    pipe.ltrim(history_key, -self.history_limit, -1)
+                pipe.expire(state_key, self.ttl_seconds)
+                pipe.expire(history_key, self.ttl_seconds)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            self.logger.warning(f"Failed to persist session {session_id}: {e}")
+            return False
+
+    async def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Read a session's fields and history, or None if it is not stored."""
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.hgetall(self._state_key(session_id))
+                pipe.lrange(self._history_key(session_id), 0, -1)
+                raw_fields, raw_history = await pipe.execute()
+            if not raw_fields:
+                return None
+            fields = _decode_fields({key.decode("utf-8") if isinstance(key, bytes) else key: orjson.loads(raw) for key, raw in raw_fields.items()})
+            fields["conversation_history"] = [orjson.loads(entry) for entry in raw_history]
+            return fields
+        except Exception as e:
+            # Unreadable or undecodable sessions are treated as missing so the caller starts fresh
+            self.logger.warning(f"Failed to load session {session_id}: {e}")
+            return None
+
+    async def delete(self, session_id: str) -> None:
+        """Remove a session from the store."""
+        try:
+            await self.redis_client.delete(self._state_key(session_id), self._history_key(session_id))
+        except Exception as e:
+            self.logger.warning(f"Failed to delete session {session_id}: {e}")
+
+    async def close(self) -> None:
+        """Nothing to release; the Redis client belongs to the caller."""
+
+
+class SQLiteStateBackend:
+    """Single-file SQLite store in WAL mode, for deployments that want crash-safe sessions without Redis."""
+
+    def __init__(self, path: str = "state.db", ttl_seconds: int = 1800, history_limit: int = 100):
+        """Initialize SQLite state backend."""
+        self.logger = logging.getLogger(__name__)
+        self.ttl_seconds = ttl_seconds
+        self.history_limit = history_limit
+        # One worker thread serializes access to the shared connection
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-state")
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS sessions (session_id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at INTEGER NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS history (seq INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, entry TEXT NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS history_session ON history (session_id, seq)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated_at)")
+        self._conn.commit()
+        # Only touched on the worker thread
+        self._next_prune = 0
+        self._closed = False
+
+    async def _run(self, call: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking database call on the backend's worker thread."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call, *args)
+
+    async def save(self, session_id: str, fields: Dict[str, Any], history: Iterable[Sequence[Any]] = ()) -> bool:
+        """Merge changed fields into the stored state and append new history rows in one transaction."""
+        fields = {key: encode_value(value).decode("utf-8") for key, value in fields.items() if key not in TRANSIENT_FIELDS}
+        history = [encode_value(entry).decode("utf-8") for entry in history]
+        if not fields and not history:
+            return True
+        try:
+            await self._run(self._save, session_id, fields, history)
+            return True
+        except Exception as e:
+            self.logger.warning(f"Failed to persist session {session_id}: {e}")
+            return False
+
+    def _save(self, session_id: str, fields: Dict[str, str], history: List[str]) -> None:
+        now = int(time.time())
+        with self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO sessions (session_id, state, updated_at) VALUES (?, '{}', ?)", (session_id, now))
+            if fields:
+                # json_set replaces only the changed top-level fields of the stored state
+                paths = ", ".join("?, json(?)" for _ in fields)
+                params = [value for key, encoded in fields.items() for value in (f'$."{key}"', encoded)]
+                self._conn.execute(f"UPDATE sessions SET state = json_set(state, {paths}), updated_at = ? WHERE session_id = ?", (*params, now, session_id))
+            else:
+                self._conn.execute("UPDATE sessions SET updated_at = ? WHERE session_id = ?", (now, session_id))
+            if history:
+                self._conn.executemany("INSERT INTO history (session_id, entry) VALUES (?, ?)", [(session_id, entry) for entry in history])
+                self._conn.execute(
+                    "DELETE FROM history WHERE session_id = ? AND seq <= "
+                    "(SELECT seq FROM history WHERE session_id = ? ORDER BY seq DESC LIMIT 1 OFFSET ?)",
+                    (session_id, session_id, self.history_limit)
+                )
+            if now >= self._next_prune:
+                self._prune(now - self.ttl_seconds)
+                self._next_prune = now + PRUNE_INTERVAL_SECONDS
+
+    def _prune(self, cutoff: int) -> None:
+        """Delete sessions last saved before cutoff, with their history; load already treats them as missing."""
+        self._conn.execute("DELETE FROM history WHERE session_id IN (SELECT session_id FROM sessions WHERE updated_at < ?)", (cutoff,))
+        self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,))
+
+    async def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Read a session's fields and history, or None if it is not stored or has expired."""
+        try:
+            row, history = await self._run(self._load, session_id)
+            if row is None or row[1] < time.time() - self.ttl_seconds:
+                return None
+            fields = _decode_fields(orjson.loads(row[0]))
+            fields["conversation_history"] = [orjson.loads(entry) for (entry,) in history]
+            return fields
+        except Exception as e:
+            # Unreadable or undecodable sessions are treated as missing so the caller starts fresh
+            self.logger.warning(f"Failed to load session {session_id}: {e}")
+            return None
+
+    def _load(self, session_id: str) -> tuple:
+        row = self._conn.execute("SELECT state, updated_at FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        history = self._conn.execute("SELECT entry FROM history WHERE session_id = ? ORDER BY seq", (session_id,)).fetchall() if row else []
+        return row, history
+
+    async def delete(self, session_id: str) -> None:
+        """Remove a session from the store."""
+        try:
+            await self._run(self._delete, session_id)
+        except Exception as e:
+            self.logger.warning(f"Failed to delete session {session_id}: {e}")
+
+    def _delete(self, session_id: str) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM history WHERE session_id = ?", (session_id,))
+
+    async def close(self) -> None:
+        """Close the connection once queued calls have run, then stop the worker thread."""
+        if self._closed:
+            return
+        self._closed = True
+        await self._run(self._conn.close)
+        self._executor.shutdown(wait=False)
+
+
+StateBackend = Union[RedisStateBackend, SQLiteStateBackend]
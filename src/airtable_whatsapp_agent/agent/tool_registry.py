@@ -3,17 +3,45 @@ Tool registry for the autonomous agent.
 Manages available tools and their execution.
 """
 
+import asyncio
+import functools
+import inspect
 import logging
-from typing import Any, Dict, List, Optional, Callable
-from dataclasses import dataclass
+import re
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Callable, Sequence, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
-from ..models.agent import ToolExecutionResult
+import orjson
+from ..models.agent import AgentActionType, ToolExecutionResult
 from ..mcp.manager import MCPServerManager
 from ..config import Settings
 from ..aws.eventbridge import EventBridgeScheduler, ScheduledTask, ScheduleType
 
 logger = logging.getLogger(__name__)
 
+AIRTABLE_BATCH_LIMIT = 10
+
+_NON_DIGIT_RE = re.compile(r"\D")
+
+# Agent tools that map one-to-one onto an MCP server tool
+_MCP_BINDINGS = {
+    "list_airtable_records": ("airtable", "list_records"),
+    "get_airtable_record": ("airtable", "get_record"),
+    "create_airtable_record": ("airtable", "create_record"),
+    "update_airtable_record": ("airtable", "update_record"),
+    "batch_update_airtable_records": ("airtable", "update_records"),
+    "search_airtable_records": ("airtable", "search_records"),
+    "send_whatsapp_message": ("whatsapp", "send_text_message"),
+    "send_whatsapp_template": ("whatsapp", "send_template_message"),
+    "send_whatsapp_media": ("whatsapp", "send_media_message"),
+}
+
+_SCHEDULE_PREFIX = {"cron": ScheduleType.CRON, "at": ScheduleType.ONE_TIME, "rate": ScheduleType.RATE}
+# Shared across scheduled tasks; EventBridgeScheduler only reads it
+_SCHEDULE_TAGS = {"CreatedBy": "AutonomousAgent", "Component": "TaskScheduler"}
+
 
 class ToolCategory(Enum):
     """Categories of available tools."""
@@ -23,7 +51,7 @@ class ToolCategory(Enum):
     UTILITY = "utility"
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolDefinition:
     """Definition of a tool available to the agent."""
     name: str
@@ -33,6 +61,296 @@ class ToolDefinition:
     required_permissions: List[str]
     execution_function: Callable
     examples: List[Dict[str, Any]]
+    accepts_raw_parameters: bool = False
+    idempotent: bool = False
+    ttl_seconds: int = 0
+    # Derived at registration
+    _perms_set: FrozenSet[str] = field(default=frozenset(), init=False, repr=False)
+    _required_params: FrozenSet[str] = field(default=frozenset(), init=False, repr=False)
+    _is_coroutine: bool = field(default=False, init=False, repr=False)
+
+
+# Static parts of the built-in tools, shared by every registry (treat as read-only)
+_DEFAULT_TOOL_SPECS: Tuple[Dict[str, Any], ...] = (
+    {
+        "name": "list_airtable_records",
+        "category": ToolCategory.AIRTABLE,
+        "description": "List records from an Airtable table with optional filtering",
+        "parameters": {
+            "table_name": {"type": "string", "required": True, "description": "Name of the table"},
+            "base_id": {"type": "string", "required": False, "description": "Airtable base ID"},
+            "filter_formula": {"type": "string", "required": False, "description": "Airtable filter formula"},
+            "max_records": {"type": "integer", "required": False, "description": "Maximum number of records to return"},
+            "sort": {"type": "array", "required": False, "description": "Sort configuration"}
+        },
+        "required_permissions": ["airtable:read"],
+        "accepts_raw_parameters": True,
+        "idempotent": True,
+        "ttl_seconds": 60,
+        "examples": [
+            {
+                "description": "List all contacts",
+                "parameters": {"table_name": "Contacts"}
+            },
+            {
+                "description": "List active projects",
+                "parameters": {
+                    "table_name": "Projects",
+                    "filter_formula": "{Status} = 'Active'"
+                }
+            }
+        ]
+    },
+    {
+        "name": "get_airtable_record",
+        "category": ToolCategory.AIRTABLE,
+        "description": "Get a specific record from Airtable by ID",
+        "parameters": {
+            "table_name": {"type": "string", "required": True, "description": "Name of the table"},
+            "record_id": {"type": "string", "required": True, "description": "Record ID"},
+            "base_id": {"type": "string", "required": False, "description": "Airtable base ID"}
+        },
+        "required_permissions": ["airtable:read"],
+        "accepts_raw_parameters": True,
+        "idempotent": True,
+        "ttl_seconds": 60,
+        "examples": [
+            {
+                "description": "Get specific contact",
+                "parameters": {
+                    "table_name": "Contacts",
+                    "record_id": "recXXXXXXXXXXXXXX"
+                }
+            }
+        ]
+    },
+    {
+        "name": "create_airtable_record",
+        "category": ToolCategory.AIRTABLE,
+        "description": "Create a new record in Airtable",
+        "parameters": {
+            "table_name": {"type": "string", "required": True, "description": "Name of the table"},
+            "fields": {"type": "object", "required": True, "description": "Record fields"},
+            "base_id": {"type": "string", "required": False, "description": "Airtable base ID"}
+        },
+        "required_permissions": ["airtable:write"],
+        "accepts_raw_parameters": True,
+        "examples": [
+            {
+                "description": "Create new contact",
+                "parameters": {
+                    "table_name": "Contacts",
+                    "fields": {
+                        "Name": "John Doe",
+                        "Phone": "+1234567890",
+                        "Email": "john@example.com"
+                    }
+                }
+            }
+        ]
+    },
+    {
+        "name": "update_airtable_record",
+        "category": ToolCategory.AIRTABLE,
+        "description": "Update an existing record in Airtable",
+        "parameters": {
+            "table_name": {"type": "string", "required": True, "description": "Name of the table"},
+            "record_id": {"type": "string", "required": True, "description": "Record ID"},
+            "fields": {"type": "object", "required": True, "description": "Fields to update"},
+            "base_id": {"type": "string", "required": False, "description": "Airtable base ID"}
+        },
+        "required_permissions": ["airtable:write"],
+        "accepts_raw_parameters": True,
+        "examples": [
+            {
+                "description": "Update contact phone",
+                "parameters": {
+                    "table_name": "Contacts",
+                    "record_id": "recXXXXXXXXXXXXXX",
+                    "fields": {"Phone": "+1987654321"}
+                }
+            }
+        ]
+    },
+    {
+        "name": "batch_update_airtable_records",
+        "category": ToolCategory.AIRTABLE,
+        "description": f"Update up to {AIRTABLE_BATCH_LIMIT} records of one Airtable table in a single request",
+        "parameters": {
+            "table_name": {"type": "string", "required": True, "description": "Name of the table"},
+            "records": {"type": "array", "required": True, "description": "Records to update, each with id and fields"},
+            "base_id": {"type": "string", "required": False, "description": "Airtable base ID"}
+        },
+        "required_permissions": ["airtable:write"],
+        "accepts_raw_parameters": True,
+        "examples": [
+            {
+                "description": "Mark two tasks as done",
+                "parameters": {
+                    "table_name": "Tasks",
+                    "records": [
+                        {"id": "recXXXXXXXXXXXXXX", "fields": {"Status": "Done"}},
+                        {"id": "recYYYYYYYYYYYYYY", "fields": {"Status": "Done"}}
+                    ]
+                }
+            }
+        ]
+    },
+    {
+        "name": "search_airtable_records",
+        "category": ToolCategory.AIRTABLE,
+        "description": "Search records in Airtable using text search",
+        "parameters": {
+            "table_name": {"type": "string", "required": True, "description": "Name of the table"},
+            "search_term": {"type": "string", "required": True, "description": "Search term"},
+            "fields": {"type": "array", "required": False, "description": "Fields to search in"},
+            "base_id": {"type": "string", "required": False, "description": "Airtable base ID"}
+        },
+        "required_permissions": ["airtable:read"],
+        "accepts_raw_parameters": True,
+        "idempotent": True,
+        "ttl_seconds": 60,
+        "examples": [
+            {
+                "description": "Search for contacts by name",
+                "parameters": {
+                    "table_name": "Contacts",
+                    "search_term": "John",
+                    "fields": ["Name", "Email"]
+                }
+            }
+        ]
+    },
+    {
+        "name": "send_whatsapp_message",
+        "category": ToolCategory.WHATSAPP,
+        "description": "Send a text message via WhatsApp",
+        "parameters": {
+            "to": {"type": "string", "required": True, "description": "Recipient phone number"},
+            "message": {"type": "string", "required": True, "description": "Message text"},
+            "preview_url": {"type": "boolean", "required": False, "description": "Enable URL preview"}
+        },
+        "required_permissions": ["whatsapp:send"],
+        "accepts_raw_parameters": True,
+        "examples": [
+            {
+                "description": "Send notification to collaborator",
+                "parameters": {
+                    "to": "+1234567890",
+                    "message": "Project update: Task completed successfully."
+                }
+            }
+        ]
+    },
+    {
+        "name": "send_whatsapp_template",
+        "category": ToolCategory.WHATSAPP,
+        "description": "Send a template message via WhatsApp",
+        "parameters": {
+            "to": {"type": "string", "required": True, "description": "Recipient phone number"},
+            "template_name": {"type": "string", "required": True, "description": "Template name"},
+            "language": {"type": "string", "required": True, "description": "Language code"},
+            "components": {"type": "array", "required": False, "description": "Template components"}
+        },
+        "required_permissions": ["whatsapp:send"],
+        "accepts_raw_parameters": True,
+        "examples": [
+            {
+                "description": "Send project reminder template",
+                "parameters": {
+                    "to": "+1234567890",
+                    "template_name": "project_reminder",
+                    "language": "en"
+                }
+            }
+        ]
+    },
+    {
+        "name": "send_whatsapp_media",
+        "category": ToolCategory.WHATSAPP,
+        "description": "Send media (image, document, etc.) via WhatsApp",
+        "parameters": {
+            "to": {"type": "string", "required": True, "description": "Recipient phone number"},
+            "media_type": {"type": "string", "required": True, "description": "Media type (image, document, audio, video)"},
+            "media_url": {"type": "string", "required": True, "description": "Media URL"},
+            "caption": {"type": "string", "required": False, "description": "Media caption"},
+            "filename": {"type": "string", "required": False, "description": "File name for documents"}
+        },
+        "required_permissions": ["whatsapp:send"],
+        "accepts_raw_parameters": True,
+        "examples": [
+            {
+                "description": "Send project report",
+                "parameters": {
+                    "to": "+1234567890",
+                    "media_type": "document",
+                    "media_url": "https://example.com/report.pdf",
+                    "filename": "project_report.pdf",
+                    "caption": "Monthly project report"
+                }
+            }
+        ]
+    },
+    {
+        "name": "schedule_task",
+        "category": ToolCategory.SYSTEM,
+        "description": "Schedule a recurring task using AWS EventBridge",
+        "parameters": {
+            "task_name": {"type": "string", "required": True, "description": "Task name"},
+            "schedule_expression": {"type": "string", "required": True, "description": "Cron or rate expression"},
+            "task_description": {"type": "string", "required": True, "description": "Task description"},
+            "parameters": {"type": "object", "required": False, "description": "Task parameters"}
+        },
+        "required_permissions": ["system:schedule"],
+        "examples": [
+            {
+                "description": "Schedule weekly project check",
+                "parameters": {
+                    "task_name": "weekly_project_check",
+                    "schedule_expression": "rate(7 days)",
+                    "task_description": "Check project progress and send updates"
+                }
+            }
+        ]
+    },
+    {
+        "name": "format_phone_number",
+        "category": ToolCategory.UTILITY,
+        "description": "Format and validate phone numbers",
+        "parameters": {
+            "phone_number": {"type": "string", "required": True, "description": "Phone number to format"},
+            "country_code": {"type": "string", "required": False, "description": "Default country code"}
+        },
+        "required_permissions": [],
+        "idempotent": True,
+        "ttl_seconds": 3600,
+        "examples": [
+            {
+                "description": "Format US phone number",
+                "parameters": {
+                    "phone_number": "1234567890",
+                    "country_code": "US"
+                }
+            }
+        ]
+    },
+)
+
+# Built-in tools implemented on the registry itself rather than forwarded to MCP
+_FN_BY_NAME = {
+    "schedule_task": "_execute_schedule_task",
+    "format_phone_number": "_execute_format_phone_number",
+}
+
+
+def _fail(error: str) -> ToolExecutionResult:
+    """Result of a tool call that failed before or during execution."""
+    return ToolExecutionResult(success=False, result=None, error=error, execution_time=0.0)
+
+
+def _permission_set(permissions: Iterable[str]) -> FrozenSet[str]:
+    """Permissions as a hashable set; callers holding a frozenset skip the conversion."""
+    return permissions if isinstance(permissions, frozenset) else frozenset(permissions)
 
 
 class ToolRegistry:
@@ -44,389 +362,211 @@ class ToolRegistry:
         self.mcp_manager = mcp_manager
         self.settings = settings
         self.tools: Dict[str, ToolDefinition] = {}
-        self.eventbridge_scheduler = None
-        if self.settings:
-            try:
-                self.eventbridge_scheduler = EventBridgeScheduler(self.settings)
-            except Exception as e:
-                self.logger.warning(f"Failed to initialize EventBridge scheduler: {e}")
+        self._schema_cache: Dict[str, Dict[str, Any]] = {}
+        self._by_category: Dict[ToolCategory, List[ToolDefinition]] = defaultdict(list)
+        self._available_cached = functools.lru_cache(maxsize=64)(self._compute_available_tools)
+        self._schemas_cached = functools.lru_cache(maxsize=64)(self._compute_tool_schemas)
+        self._result_cache: Dict[str, "OrderedDict[tuple, tuple]"] = {}
+        self.max_cached_results_per_session = 128
+        # Created on first use; most registries never schedule anything
+        self.eventbridge_scheduler: Optional[EventBridgeScheduler] = None
+        self._scheduler_lock = asyncio.Lock()
         self._register_default_tools()
         
     def _register_default_tools(self):
         """Register default tools available to the agent."""
-        self.register_tool(ToolDefinition(
-            name="list_airtable_records",
-            category=ToolCategory.AIRTABLE,
-            description="List records from an Airtable table with optional filtering",
-            parameters={
-                "table_name": {"type": "string", "required": True, "description": "Name of the table"},
-                "base_id": {"type": "string", "required": False, "description": "Airtable base ID"},
-                "filter_formula": {"type": "string", "required": False, "description": "Airtable filter formula"},
-                "max_records": {"type": "integer", "required": False, "description": "Maximum number of records to return"},
-                "sort": {"type": "array", "required": False, "description": "Sort configuration"}
-            },
-            required_permissions=["airtable:read"],
-            execution_function=self._execute_airtable_list_records,
-            examples=[
-                {
-                    "description": "List all contacts",
-                    "parameters": {"table_name": "Contacts"}
-                },
-                {
-                    "description": "List active projects",
-                    "parameters": {
-                        "table_name": "Projects",
-                        "filter_formula": "{Status} = 'Active'"
-                    }
-                }
-            ]
-        ))
-        self.register_tool(ToolDefinition(
-            name="get_airtable_record",
-            category=ToolCategory.AIRTABLE,
-            description="Get a specific record from Airtable by ID",
-            parameters={
-                "table_name": {"type": "string", "required": True, "description": "Name of the table"},
-                "record_id": {"type": "string", "required": True, "description": "Record ID"},
-                "base_id": {"type": "string", "required": False, "description": "Airtable base ID"}
-            },
-            required_permissions=["airtable:read"],
-            execution_function=self._execute_airtable_get_record,
-            examples=[
-                {
-                    "description": "Get specific contact",
-                    "parameters": {
-                        "table_name": "Contacts",
-                        "record_id": "recXXXXXXXXXXXXXX"
-                    }
-                }
-            ]
-        ))
-        self.register_tool(ToolDefinition(
-            name="create_airtable_record",
-            category=ToolCategory.AIRTABLE,
-            description="Create a new record in Airtable",
-            parameters={
-                "table_name": {"type": "string", "required": True, "description": "Name of the table"},
-                "fields": {"type": "object", "required": True, "description": "Record fields"},
-                "base_id": {"type": "string", "required": False, "description": "Airtable base ID"}
-            },
-            required_permissions=["airtable:write"],
-            execution_function=self._execute_airtable_create_record,
-            examples=[
-                {
-                    "description": "Create new contact",
-                    "parameters": {
-                        "table_name": "Contacts",
-                        "fields": {
-                            "Name": "John Doe",
-                            "Phone": "+1234567890",
-                            "Email": "john@example.com"
-                        }
-                    }
-                }
-            ]
-        ))
-        self.register_tool(ToolDefinition(
-            name="update_airtable_record",
-            category=ToolCategory.AIRTABLE,
-            description="Update an existing record in Airtable",
-            parameters={
-                "table_name": {"type": "string", "required": True, "description": "Name of the table"},
-                "record_id": {"type": "string", "required": True, "description": "Record ID"},
-                "fields": {"type": "object", "required": True, "description": "Fields to update"},
-                "base_id": {"type": "string", "required": False, "description": "Airtable base ID"}
-            },
-            required_permissions=["airtable:write"],
-            execution_function=self._execute_airtable_update_record,
-            examples=[
-                {
-                    "description": "Update contact phone",
-                    "parameters": {
-                        "table_name": "Contacts",
-                        "record_id": "recXXXXXXXXXXXXXX",
-                        "fields": {"Phone": "+1987654321"}
-                    }
-                }
-            ]
-        ))
-        self.register_tool(ToolDefinition(
-            name="search_airtable_records",
-            category=ToolCategory.AIRTABLE,
-            description="Search records in Airtable using text search",
-            parameters={
-                "table_name": {"type": "string", "required": True, "description": "Name of the table"},
-                "search_term": {"type": "string", "required": True, "description": "Search term"},
-                "fields": {"type": "array", "required": False, "description": "Fields to search in"},
-                "base_id": {"type": "string", "required": False, "description": "Airtable base ID"}
-            },
-            required_permissions=["airtable:read"],
-            execution_function=self._execute_airtable_search_records,
-            examples=[
-                {
-                    "description": "Search for contacts by name",
-                    "parameters": {
-                        "table_name": "Contacts",
-                        "search_term": "John",
-                        "fields": ["Name", "Email"]
-                    }
-                }
-            ]
-        ))
-        self.register_tool(ToolDefinition(
-            name="send_whatsapp_message",
-            category=ToolCategory.WHATSAPP,
-            description="Send a text message via WhatsApp",
-            parameters={
-                "to": {"type": "string", "required": True, "description": "Recipient phone number"},
-                "message": {"type": "string", "required": True, "description": "Message text"},
-                "preview_url": {"type": "boolean", "required": False, "description": "Enable URL preview"}
-            },
-            required_permissions=["whatsapp:send"],
-            execution_function=self._execute_whatsapp_send_message,
-            examples=[
-                {
-                    "description": "Send notification to collaborator",
-                    "parameters": {
-                        "to": "+1234567890",
-                        "message": "Project update: Task completed successfully."
-                    }
-                }
-            ]
-        ))
-        self.register_tool(ToolDefinition(
-            name="send_whatsapp_template",
-            category=ToolCategory.WHATSAPP,
-            description="Send a template message via WhatsApp",
-            parameters={
-                "to": {"type": "string", "required": True, "description": "Recipient phone number"},
-                "template_name": {"type": "string", "required": True, "description": "Template name"},
-                "language": {"type": "string", "required": True, "description": "Language code"},
-                "components": {"type": "array", "required": False, "description": "Template components"}
-            },
-            required_permissions=["whatsapp:send"],
-            execution_function=self._execute_whatsapp_send_template,
-            examples=[
-                {
-                    "description": "Send project reminder template",
-                    "parameters": {
-                        "to": "+1234567890",
-                        "template_name": "project_reminder",
-                        "language": "en"
-                    }
-                }
-            ]
-        ))
-        self.register_tool(ToolDefinition(
-            name="send_whatsapp_media",
-            category=ToolCategory.WHATSAPP,
-            description="Send media (image, document, etc.) via WhatsApp",
-            parameters={
-                "to": {"type": "string", "required": True, "description": "Recipient phone number"},
-                "media_type": {"type": "string", "required": True, "description": "Media type (image, document, audio, video)"},
-                "media_url": {"type": "string", "required": True, "description": "Media URL"},
-                "caption": {"type": "string", "required": False, "description": "Media caption"},
-                "filename": {"type": "string", "required": False, "description": "File name for documents"}
-            },
-            required_permissions=["whatsapp:send"],
-            execution_function=self._execute_whatsapp_send_media,
-            examples=[
-                {
-                    "description": "Send project report",
-                    "parameters": {
-                        "to": "+1234567890",
-                        "media_type": "document",
-                        "media_url": "https://example.com/report.pdf",
-                        "filename": "project_report.pdf",
-                        "caption": "Monthly project report"
-                    }
-                }
-            ]
-        ))
-        self.register_tool(ToolDefinition(
-            name="schedule_task",
-            category=ToolCategory.SYSTEM,
-            description="Schedule a recurring task using AWS EventBridge",
-            parameters={
-                "task_name": {"type": "string", "required": True, "description": "Task name"},
-                "schedule_expression": {"type": "string", "required": True, "description": "Cron or rate expression"},
-                "task_description": {"type": "string", "required": True, "description": "Task description"},
-                "parameters": {"type": "object", "required": False, "description": "Task parameters"}
-            },
-            required_permissions=["system:schedule"],
-            execution_function=self._execute_schedule_task,
-            examples=[
-                {
-                    "description": "Schedule weekly project check",
-                    "parameters": {
-                        "task_name": "weekly_project_check",
-                        "schedule_expression": "rate(7 days)",
-                        "task_description": "Check project progress and send updates"
-                    }
-                }
-            ]
-        ))
-        self.register_tool(ToolDefinition(
-            name="format_phone_number",
-            category=ToolCategory.UTILITY,
-            description="Format and validate phone numbers",
-            parameters={
-                "phone_number": {"type": "string", "required": True, "description": "Phone number to format"},
-                "country_code": {"type": "string", "required": False, "description": "Default country code"}
-            },
-            required_permissions=[],
-            execution_function=self._execute_format_phone_number,
-            examples=[
-                {
-                    "description": "Format US phone number",
-                    "parameters": {
-                        "phone_number": "1234567890",
-                        "country_code": "US"
-                    }
-                }
-            ]
-        ))
-        self.logger.info(f"Registered {len(self.tools)} default tools")
+        for spec in _DEFAULT_TOOL_SPECS:
+            name = spec["name"]
+            execution_function = self._mcp_binding(name) if name in _MCP_BINDINGS else getattr(self, _FN_BY_NAME[name])
+            self.register_tool(ToolDefinition(**spec, execution_function=execution_function))
+        self.logger.info("Registered %d default tools", len(self.tools))
         
     def register_tool(self, tool: ToolDefinition):
         """Register a new tool."""
+        tool._perms_set = frozenset(tool.required_permissions)
+        tool._required_params = frozenset(param_name for param_name, param_def in tool.parameters.items() if param_def.get("required", False))
+        function = tool.execution_function
+        # Older Pythons do not see through partials when checking for coroutines
+        tool._is_coroutine = inspect.iscoroutinefunction(function.func if isinstance(function, functools.partial) else function)
+        replaced = self.tools.get(tool.name)
+        if replaced:
+            self._by_category[replaced.category].remove(replaced)
         self.tools[tool.name] = tool
-        self.logger.debug(f"Registered tool: {tool.name}")
+        self._by_category[tool.category].append(tool)
+        self._schema_cache[tool.name] = {
+            "name": tool.name,
+            "description": tool.description,
+            "parameters": {
+                "type": "object",
+                "properties": tool.parameters,
+                "required": [param_name for param_name, param_def in tool.parameters.items() if param_def.get("required", False)]
+            }
+        }
+        self._available_cached.cache_clear()
+        self._schemas_cached.cache_clear()
+        self.logger.debug("Registered tool: %s", tool.name)
         
     def get_tool(self, name: str) -> Optional[ToolDefinition]:
         """Get tool definition by name."""
         return self.tools.get(name)
         
     def get_tools_by_category(self, category: ToolCategory) -> List[ToolDefinition]:
-        """Get all tools in a category."""
-        return [tool for tool in self.tools.values() if tool.category == category]
+        """Get all tools in a category (shared list, do not mutate)."""
+        return self._by_category.get(category, [])
+        
+    def get_available_tools(self, permissions: Iterable[str]) -> List[ToolDefinition]:
+        """Get tools available with given permissions (shared cached list, do not mutate)."""
+        return self._available_cached(_permission_set(permissions))
         
-    def get_available_tools(self, permissions: List[str]) -> List[ToolDefinition]:
-        """Get tools available with given permissions."""
+    def _compute_available_tools(self, permissions: FrozenSet[str]) -> List[ToolDefinition]:
+        """Filter registered tools by a permission set."""
         available = []
         for tool in self.tools.values():
-            if not tool.required_permissions or all(perm in permissions for perm in tool.required_permissions):
+            if not tool._perms_set or tool._perms_set.issubset(permissions):
                 available.append(tool)
         return available
         
-    async def execute_tool(self, tool_name: str, parameters: Dict[str, Any], user_permissions: List[str]) -> ToolExecutionResult:
-        """Execute a tool with given parameters."""
+    def actions_are_independent(self, first: Any, second: Any) -> bool:
+        """Check whether two tool-call actions can safely run concurrently."""
+        if first.action_type != AgentActionType.TOOL_CALL or second.action_type != AgentActionType.TOOL_CALL:
+            return False
+        first_record = first.parameters.get("record_id")
+        if first_record and first_record == second.parameters.get("record_id"):
+            return False
+        first_id = getattr(first, "action_id", None)
+        second_id = getattr(second, "action_id", None)
+        if first_id and first_id in getattr(second, "prerequisites", []):
+            return False
+        if second_id and second_id in getattr(first, "prerequisites", []):
+            return False
+        return True
+
+    async def execute_tool(self, tool_name: str, parameters: Dict[str, Any], user_permissions: Iterable[str], parameters_raw: Optional[bytes] = None, session_id: Optional[str] = None) -> ToolExecutionResult:
+        """Execute a tool with given parameters, reusing fresh results of idempotent tools within a session."""
         tool = self.tools.get(tool_name)
         if not tool:
-            return ToolExecutionResult(success=False, result=None, error=f"Tool '{tool_name}' not found", execution_time=0.0)
-        if tool.required_permissions and not all(perm in user_permissions for perm in tool.required_permissions):
-            missing_perms = [perm for perm in tool.required_permissions if perm not in user_permissions]
-            return ToolExecutionResult(success=False, result=None, error=f"Missing permissions: {missing_perms}", execution_time=0.0)
+            return _fail(f"Tool '{tool_name}' not found")
+        perm_set = _permission_set(user_permissions)
+        if tool._perms_set and not tool._perms_set.issubset(perm_set):
+            missing_perms = [perm for perm in tool.required_permissions if perm not in perm_set]
+            return _fail(f"Missing permissions: {missing_perms}")
         validation_error = self._validate_parameters(tool, parameters)
         if validation_error:
-            return ToolExecutionResult(success=False, result=None, error=validation_error, execution_time=0.0)
+            return _fail(validation_error)
+        cache_key = None
+        if tool.idempotent and session_id is not None:
+            try:
+                cache_key = (tool_name, orjson.dumps(parameters, option=orjson.OPT_SORT_KEYS))
+            except TypeError as e:
+                # Parameters without a JSON form still run, just uncached
+                self.logger.debug("Not caching %s call: %s", tool_name, e)
+            else:
+                cached = self._get_cached_result(session_id, cache_key)
+                if cached is not None:
+                    return cached
         try:
-            import time
-            import inspect
-            start_time = time.time()
-            if inspect.iscoroutinefunction(tool.execution_function):
+            start_time = time.perf_counter()
+            if parameters_raw is not None and tool.accepts_raw_parameters:
+                result = await tool.execution_function(parameters, parameters_raw=parameters_raw)
+            elif tool._is_coroutine:
                 result = await tool.execution_function(parameters)
             else:
                 result = tool.execution_function(parameters)
-            execution_time = time.time() - start_time
-            return ToolExecutionResult(success=True, result=result, error=None, execution_time=execution_time)
+            execution_time = time.perf_counter() - start_time
+            tool_result = ToolExecutionResult(success=True, result=result, error=None, execution_time=execution_time)
+            if cache_key is not None:
+                self._cache_result(session_id, cache_key, tool, parameters.get("table_name"), tool_result)
+            elif not tool.idempotent and "table_name" in parameters:
+                self._invalidate_table(parameters["table_name"])
+            return tool_result
         except Exception as e:
-            self.logger.error(f"Tool execution error for {tool_name}: {str(e)}")
-            return ToolExecutionResult(success=False, result=None, error=str(e), execution_time=0.0)
+            self.logger.error("Tool execution error for %s: %s", tool_name, e)
+            return _fail(str(e))
             
-    def get_tool_schema(self, tool_name: str) -> Optional[Dict[str, Any]]:
-        """Get OpenAI function schema for a tool."""
-        tool = self.tools.get(tool_name)
-        if not tool:
+    async def execute_tools(self, calls: Sequence[Tuple[str, Dict[str, Any], Optional[bytes]]], user_permissions: Iterable[str], session_id: Optional[str] = None) -> List[Any]:
+        """Execute independent (tool_name, parameters, parameters_raw) calls concurrently; results keep call order and unexpected exceptions are returned in place."""
+        perm_set = _permission_set(user_permissions)
+        return await asyncio.gather(*(
+            self.execute_tool(tool_name, parameters, perm_set, parameters_raw=parameters_raw, session_id=session_id)
+            for tool_name, parameters, parameters_raw in calls
+        ), return_exceptions=True)
+        
+    def _get_cached_result(self, session_id: str, cache_key: tuple) -> Optional[ToolExecutionResult]:
+        """Return a fresh cached result for an idempotent tool call."""
+        entries = self._result_cache.get(session_id)
+        entry = entries.get(cache_key) if entries else None
+        if entry is None:
             return None
-        return {
-            "name": tool.name,
-            "description": tool.description,
-            "parameters": {
-                "type": "object",
-                "properties": tool.parameters,
-                "required": [param_name for param_name, param_def in tool.parameters.items() if param_def.get("required", False)]
-            }
-        }
+        expires_at, _, result = entry
+        if expires_at < time.monotonic():
+            del entries[cache_key]
+            return None
+        entries.move_to_end(cache_key)
+        return result
+
+    def _cache_result(self, session_id: str, cache_key: tuple, tool: ToolDefinition, table_name: Optional[str], result: ToolExecutionResult):
+        """Store an idempotent tool result for the session."""
+        entries = self._result_cache.setdefault(session_id, OrderedDict())
+        entries[cache_key] = (time.monotonic() + tool.ttl_seconds, table_name, result)
+        entries.move_to_end(cache_key)
+        while len(entries) > self.max_cached_results_per_session:
+            entries.popitem(last=False)
+
+    def _invalidate_table(self, table_name: str):
+        """Drop cached reads of a table after a write to it, across all sessions."""
+        for entries in self._result_cache.values():
+            stale = [key for key, (_, cached_table, _) in entries.items() if cached_table == table_name]
+            for key in stale:
+                del entries[key]
+
+    def clear_session_cache(self, session_id: str):
+        """Drop cached tool results for a session."""
+        self._result_cache.pop(session_id, None)
+            
+    def get_tool_schema(self, tool_name: str) -> Optional[Dict[str, Any]]:
+        """Get OpenAI function schema for a tool (built at registration, do not mutate)."""
+        return self._schema_cache.get(tool_name)
+        
+    def get_all_tool_schemas(self, permissions: Iterable[str]) -> List[Dict[str, Any]]:
+        """Get OpenAI function schemas for all available tools (shared cached list, do not mutate)."""
+        return self._schemas_cached(_permission_set(permissions))
         
-    def get_all_tool_schemas(self, permissions: List[str]) -> List[Dict[str, Any]]:
-        """Get OpenAI function schemas for all available tools."""
-        available_tools = self.get_available_tools(permissions)
-        return [self.get_tool_schema(tool.name) for tool in available_tools]
+    def _compute_tool_schemas(self, permissions: FrozenSet[str]) -> List[Dict[str, Any]]:
+        """Build OpenAI function schemas for a permission set."""
+        schemas = self._schema_cache
+        return [schemas[tool.name] for tool in self.tools.values() if not tool._perms_set or tool._perms_set.issubset(permissions)]
         
     def _validate_parameters(self, tool: ToolDefinition, parameters: Dict[str, Any]) -> Optional[str]:
         """Validate tool parameters."""
-        for param_name, param_def in tool.parameters.items():
-            if param_def.get("required", False) and param_name not in parameters:
-                return f"Missing required parameter: {param_name}"
-        return None
+        missing = tool._required_params - parameters.keys()
+        if not missing:
+            return None
+        # Report in declaration order so the error is stable across runs
+        return f"Missing required parameter: {next(name for name in tool.parameters if name in missing)}"
 
-    async def _execute_airtable_list_records(self, parameters: Dict[str, Any]) -> Any:
-        """Execute Airtable list records tool."""
-        return await self.mcp_manager.call_tool(
-            "airtable",
-            "list_records",
-            parameters
-        )
-        
-    async def _execute_airtable_get_record(self, parameters: Dict[str, Any]) -> Any:
-        """Execute Airtable get record tool."""
-        return await self.mcp_manager.call_tool(
-            "airtable",
-            "get_record",
-            parameters
-        )
-        
-    async def _execute_airtable_create_record(self, parameters: Dict[str, Any]) -> Any:
-        """Execute Airtable create record tool."""
-        return await self.mcp_manager.call_tool(
-            "airtable",
-            "create_record",
-            parameters
-        )
-        
-    async def _execute_airtable_update_record(self, parameters: Dict[str, Any]) -> Any:
-        """Execute Airtable update record tool."""
-        return await self.mcp_manager.call_tool(
-            "airtable",
-            "update_record",
-            parameters
-        )
-        
-    async def _execute_airtable_search_records(self, parameters: Dict[str, Any]) -> Any:
-        """Execute Airtable search records tool."""
-        return await self.mcp_manager.call_tool(
-            "airtable",
-            "search_records",
-            parameters
-        )
+    def _mcp_binding(self, tool_name: str) -> Callable:
+        """Execution function forwarding a tool to its MCP server tool."""
+        return functools.partial(self._call_mcp, *_MCP_BINDINGS[tool_name])
         
-    async def _execute_whatsapp_send_message(self, parameters: Dict[str, Any]) -> Any:
-        """Execute WhatsApp send message tool."""
-        return await self.mcp_manager.call_tool(
-            "whatsapp",
-            "send_text_message",
-            parameters
-        )
-        
-    async def _execute_whatsapp_send_template(self, parameters: Dict[str, Any]) -> Any:
-        """Execute WhatsApp send template tool."""
-        return await self.mcp_manager.call_tool(
-            "whatsapp",
-            "send_template_message",
-            parameters
-        )
-        
-    async def _execute_whatsapp_send_media(self, parameters: Dict[str, Any]) -> Any:
-        """Execute WhatsApp send media tool."""
-        return await self.mcp_manager.call_tool(
-            "whatsapp",
-            "send_media_message",
-            parameters
-        )
+    async def _call_mcp(self, server_name: str, mcp_tool_name: str, parameters: Dict[str, Any], parameters_raw: Optional[bytes] = None) -> Any:
+        """Execute a tool by forwarding it to an MCP server."""
+        return await self.mcp_manager.call_tool(server_name, mcp_tool_name, parameters, arguments_raw=parameters_raw)
         
+    async def _init_scheduler(self):
+        """Create the EventBridge scheduler once; boto3 client setup blocks, so it runs in the default executor."""
+        async with self._scheduler_lock:
+            if self.eventbridge_scheduler is None:
+                loop = asyncio.get_running_loop()
+                self.eventbridge_scheduler = await loop.run_in_executor(None, EventBridgeScheduler, self.settings)
+
     async def _execute_schedule_task(self, parameters: Dict[str, Any]) -> Any:
         """Execute schedule task tool."""
+        if self.eventbridge_scheduler is None and self.settings:
+            try:
+                await self._init_scheduler()
+            except Exception as e:
+                self.logger.warning("Failed to initialize EventBridge scheduler: %s", e)
+                return {"success": False, "error": f"EventBridge init failed: {e}", "task_name": parameters.get("task_name", "unknown")}
         if not self.eventbridge_scheduler:
             return {"success": False, "error": "EventBridge scheduler not available. Please check AWS configuration.", "task_name": parameters.get("task_name", "unknown")}
         try:
@@ -436,11 +576,7 @@ class ToolRegistry:
             target_function = parameters.get("target_function", "default_task_handler")
             payload = parameters.get("payload", {})
             enabled = parameters.get("enabled", True)
-            schedule_type = ScheduleType.RATE
-            if schedule_expression.startswith("cron("):
-                schedule_type = ScheduleType.CRON
-            elif schedule_expression.startswith("at("):
-                schedule_type = ScheduleType.ONE_TIME
+            schedule_type = _SCHEDULE_PREFIX.get(schedule_expression.partition("(")[0], ScheduleType.RATE)
             scheduled_task = ScheduledTask(
                 name=task_name,
                 description=task_description,
@@ -449,7 +585,7 @@ class ToolRegistry:
                 target_function=target_function,
                 payload=payload,
                 enabled=enabled,
-                tags={"CreatedBy": "AutonomousAgent", "Component": "TaskScheduler"}
+                tags=_SCHEDULE_TAGS
             )
             self.eventbridge_scheduler.register_task(scheduled_task)
             success = await self.eventbridge_scheduler.create_schedule(task_name)
@@ -469,15 +605,22 @@ class ToolRegistry:
         except KeyError as e:
             return {"success": False, "error": f"Missing required parameter: {str(e)}", "task_name": parameters.get("task_name", "unknown")}
         except Exception as e:
-            self.logger.error(f"Error scheduling task: {str(e)}")
+            self.logger.error("Error scheduling task: %s", e)
             return {"success": False, "error": f"Unexpected error: {str(e)}", "task_name": parameters.get("task_name", "unknown")}
         
     def _execute_format_phone_number(self, parameters: Dict[str, Any]) -> Any:
         """Execute format phone number tool."""
-        import re
         phone = parameters["phone_number"]
         country_code = parameters.get("country_code", "US")
-        digits = re.sub(r'\D', '', phone)
+        # Already-clean numbers skip stripping; filtering in C beats the regex engine for short input
+        if phone.isdecimal():
+            digits = phone
+        elif phone.startswith("+") and phone[1:].isdecimal():
+            digits = phone[1:]
+        elif len(phone) < 16:
+            digits = "".join(filter(str.isdecimal, phone))
+        else:
+            digits = _NON_DIGIT_RE.sub("", phone)
         if country_code == "US" and len(digits) == 10:
             formatted = f"+1{digits}"
         elif digits.startswith("1") and len(digits) == 11:
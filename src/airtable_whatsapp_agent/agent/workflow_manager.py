@@ -5,26 +5,140 @@ Orchestrates the execution of agent workflows and manages concurrent sessions.
 
 import logging
 import asyncio
+import contextvars
+import itertools
+import time
 from typing import Any, Dict, List, Optional
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor
-import uuid
-from .state_manager import StateManager, AgentGraphState
+from secrets import token_hex
+import redis.asyncio as redis
+from .state_manager import StateManager, AgentGraphState, MAX_HISTORY
+from .state_store import RedisStateBackend, SQLiteStateBackend
 from .graph_builder import GraphBuilder
 from .tool_registry import ToolRegistry
-from ..models.agent import AgentState
+from ..models.agent import AgentStateType
 from ..mcp.manager import MCPServerManager
 from ..config import Settings
 
 
 logger = logging.getLogger(__name__)
 
+# Messages a user sends within this window are answered by a single graph run
+MESSAGE_BATCH_WINDOW_S = 0.1
+# Must be a power of two; shards are picked by masking the session id hash
+SESSION_SHARDS = 16
+# Sessions summarized per event loop turn by get_active_sessions
+STATUS_BATCH_SIZE = 1000
+
+_DEFAULT_RESPONSE = "I've processed your message. How can I help you further?"
+_ERR_RETRY = "I encountered an error processing your request. Please try again or contact support if the issue persists."
+_ERR_GENERIC = "I'm experiencing technical difficulties. Please try again later."
+
+
+class WorkflowEntry:
+    """Bookkeeping for one active session; timings are time.monotonic() readings except start_wall."""
+
+    __slots__ = ("user_phone", "start_time", "start_wall", "status", "message_count", "last_activity", "stop_reason", "error")
+
+    def __init__(self, user_phone: str):
+        """Initialize entry for a session starting now."""
+        now = time.monotonic()
+        self.user_phone = user_phone
+        self.start_time = now
+        self.start_wall = datetime.utcnow()
+        self.status = "running"
+        self.message_count = 0
+        self.last_activity = now
+        self.stop_reason: Optional[str] = None
+        self.error: Optional[str] = None
+
+    def wall_time(self, reading: float) -> datetime:
+        """Wall-clock UTC time of a monotonic reading taken during this session."""
+        return self.start_wall + timedelta(seconds=reading - self.start_time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a plain dict with ISO timestamps, omitting stop_reason and error until they are set."""
+        data = {
+            "user_phone": self.user_phone,
+            "start_time": self.start_wall.isoformat(),
+            "status": self.status,
+            "message_count": self.message_count,
+            "last_activity": self.wall_time(self.last_activity).isoformat()
+        }
+        if self.stop_reason is not None:
+            data["stop_reason"] = self.stop_reason
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+
+class SessionShards:
+    """Session table split across shards by session id hash, each kept in activity order (least recent first)."""
+
+    __slots__ = ("_shards", "_mask", "_count")
+
+    def __init__(self, shards: int = SESSION_SHARDS):
+        """Initialize empty shards."""
+        self._shards: List["OrderedDict[str, WorkflowEntry]"] = [OrderedDict() for _ in range(shards)]
+        self._mask = shards - 1
+        self._count = 0
+
+    def _shard(self, session_id: str) -> "OrderedDict[str, WorkflowEntry]":
+        return self._shards[hash(session_id) & self._mask]
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._shard(session_id)
+
+    def __getitem__(self, session_id: str) -> WorkflowEntry:
+        return self._shard(session_id)[session_id]
+
+    def __setitem__(self, session_id: str, workflow: WorkflowEntry) -> None:
+        shard = self._shard(session_id)
+        if session_id not in shard:
+            self._count += 1
+        shard[session_id] = workflow
+        shard.move_to_end(session_id)
+
+    def __delitem__(self, session_id: str) -> None:
+        del self._shard(session_id)[session_id]
+        self._count -= 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self._shards)
+
+    def get(self, session_id: str, default: Optional[WorkflowEntry] = None) -> Optional[WorkflowEntry]:
+        """Get a session's workflow info."""
+        return self._shard(session_id).get(session_id, default)
+
+    def touch(self, session_id: str) -> None:
+        """Move a session to the most recent end of its shard."""
+        self._shard(session_id).move_to_end(session_id)
+
+    def oldest(self) -> Optional[WorkflowEntry]:
+        """Least recently active session, found by comparing the front of each shard."""
+        fronts = [next(iter(shard.values())) for shard in self._shards if shard]
+        return min(fronts, key=lambda workflow: workflow.last_activity, default=None)
+
+    def idle_since(self, cutoff: float) -> List[str]:
+        """Ids of sessions with no activity after cutoff; only the stale front of each shard is read."""
+        session_ids = []
+        for shard in self._shards:
+            for session_id, workflow in shard.items():
+                if workflow.last_activity > cutoff:
+                    break
+                session_ids.append(session_id)
+        return session_ids
+
 
 class WorkflowManager:
     """Manages agent workflows and concurrent session execution."""
     
-    def __init__(self, mcp_manager: MCPServerManager, openai_api_key: str, settings: Optional[Settings] = None, max_concurrent_sessions: int = 10, session_timeout_minutes: int = 30, model_name: str = "gpt-4-turbo-preview", temperature: float = 0.5, max_tokens: int = 2000):
-        """Initialize workflow manager."""
+    def __init__(self, mcp_manager: MCPServerManager, openai_api_key: str, settings: Optional[Settings] = None, max_concurrent_sessions: int = 10, session_timeout_minutes: int = 30, model_name: str = "gpt-4-turbo-preview", temperature: float = 0.5, max_tokens: int = 2000, redis_client: Optional[redis.Redis] = None):
+        """Initialize workflow manager; redis_client is shared with the caller, who closes it."""
         self.logger = logging.getLogger(__name__)
         self.mcp_manager = mcp_manager
         self.openai_api_key = openai_api_key
@@ -32,132 +146,230 @@ class WorkflowManager:
         self.temperature = temperature
         self.max_tokens = max_tokens
         self.max_concurrent_sessions = max_concurrent_sessions
-        self.session_timeout = timedelta(minutes=session_timeout_minutes)
-        self.state_manager = StateManager()
+        self._session_timeout_s = session_timeout_minutes * 60.0
+        # A client created here is owned, and closed on shutdown
+        self._owned_redis = redis.from_url(settings.redis_url) if settings and redis_client is None else None
+        redis_client = redis_client or self._owned_redis
+        state_backend = None
+        if settings and settings.sqlite_state_path:
+            state_backend = SQLiteStateBackend(settings.sqlite_state_path, ttl_seconds=settings.redis_session_ttl_seconds, history_limit=settings.redis_history_limit)
+        elif settings:
+            state_backend = RedisStateBackend(redis_client, ttl_seconds=settings.redis_session_ttl_seconds, history_limit=settings.redis_history_limit)
+        self.state_manager = StateManager(backend=state_backend, max_history=settings.redis_history_limit if settings else MAX_HISTORY)
         self.tool_registry = ToolRegistry(mcp_manager, settings=settings)
-        self.graph_builder = GraphBuilder(self.state_manager, self.tool_registry, openai_api_key, model_name=model_name, temperature=temperature, max_tokens=max_tokens)
-        self.active_workflows: Dict[str, Dict[str, Any]] = {}
-        self.executor = ThreadPoolExecutor(max_workers=max_concurrent_sessions)
-        self.metrics = {
-            "total_sessions": 0,
-            "successful_sessions": 0,
-            "failed_sessions": 0,
-            "average_session_duration": 0.0,
-            "tool_usage_count": {},
-            "error_count": 0
-        }
+        self.graph_builder = GraphBuilder(self.state_manager, self.tool_registry, openai_api_key, model_name=model_name, temperature=temperature, max_tokens=max_tokens, redis_client=redis_client)
+        # The graph shape is fixed at startup, so it is compiled and bound once
+        self._graph = self.graph_builder.get_compiled_graph()
+        self.active_workflows = SessionShards()
+        self._total_sessions = 0
+        self._successful_sessions = 0
+        self._failed_sessions = 0
+        self._average_session_duration = 0.0
+        self._timed_sessions = 0
+        self._tool_usage_count: Dict[str, int] = {}
+        self._error_count = 0
+        self._messages_sent = 0
+        self._failed_messages = 0
         self._cleanup_task = None
         self._start_cleanup_task()
+        # Persistent workers drain queued runs so bursts wait in the queue instead of spawning tasks
+        self._work_q: "asyncio.Queue[tuple]" = asyncio.Queue()
+        # Input received but not yet handed to a graph run; consumed by _resume_workflow under the session lock
+        self._pending_messages: Dict[str, List[str]] = {}
+        self._debounce_tasks: Dict[str, asyncio.Task] = {}
+        self._running = 0
+        self._workers = [self._spawn(self._worker()) for _ in range(max_concurrent_sessions)]
         
-    async def start_workflow(self, user_phone: str, initial_message: Optional[str] = None, context: Optional[Dict[str, Any]] = None, session_id: Optional[str] = None) -> str:
-        """Start a new agent workflow session."""
+    async def start_workflow(self, user_phone: str, initial_message: Optional[str] = None, context: Optional[Dict[str, Any]] = None, session_id: Optional[str] = None, wait: bool = False) -> str:
+        """Start a new agent workflow session; with wait, the first run is awaited inline when a slot is free."""
         if not session_id:
-            session_id = str(uuid.uuid4())
-        self.logger.info(f"🚀 Starting new workflow session {session_id} for user {user_phone}")
+            session_id = token_hex(12)
+        self.logger.info("🚀 Starting new workflow session %s for user %s", session_id, user_phone)
         if initial_message:
-            self.logger.debug(f"Initial message: {initial_message}")
+            self.logger.debug("Initial message: %s", initial_message)
         if len(self.active_workflows) >= self.max_concurrent_sessions:
             raise Exception("Maximum concurrent sessions reached")
-        initial_state = self.state_manager.create_initial_state(session_id=session_id, user_phone=user_phone, initial_message=initial_message, context=context)
-        self.active_workflows[session_id] = {
-            "user_phone": user_phone,
-            "start_time": datetime.utcnow(),
-            "status": "running",
-            "message_count": 0,
-            "last_activity": datetime.utcnow()
-        }
-        self.metrics["total_sessions"] += 1
-        asyncio.create_task(self._execute_workflow(session_id, initial_state))
-        self.logger.info(f"✅ Workflow session {session_id} started successfully")
+        initial_state = await self.state_manager.restore_state(session_id)
+        if initial_state:
+            self.logger.info("Resuming persisted session %s", session_id)
+            self.state_manager.update_state(session_id, {"current_message": initial_message, "message_type": "text" if initial_message else None, "current_state": AgentStateType.PROCESSING})
+            if context:
+                initial_state["metadata"].update(context)
+            self.state_manager.commit(session_id)
+        else:
+            initial_state = self.state_manager.create_initial_state(session_id=session_id, user_phone=user_phone, initial_message=initial_message, context=context)
+        self.active_workflows[session_id] = WorkflowEntry(user_phone)
+        self._total_sessions += 1
+        if wait and self._work_q.empty() and self._running < self.max_concurrent_sessions:
+            await self._run_workflow(session_id, initial_state)
+        else:
+            await self._work_q.put((session_id, initial_state))
+        self.logger.info("✅ Workflow session %s started successfully", session_id)
         return session_id
         
     async def send_message(self, session_id: str, message: str, message_type: str = "text", metadata: Optional[Dict[str, Any]] = None) -> bool:
         """Send a message to an active workflow session."""
         if session_id not in self.active_workflows:
-            self.logger.warning(f"⚠️ Session {session_id} not found")
+            self.logger.warning("⚠️ Session %s not found", session_id)
             return False
         workflow = self.active_workflows[session_id]
-        user_phone = workflow["user_phone"]
-        self.logger.info(f"💬 Processing message in session {session_id} from {user_phone}: {message}")
-        workflow["last_activity"] = datetime.utcnow()
-        workflow["message_count"] += 1
-        state = self.state_manager.get_state(session_id)
-        if not state:
-            self.logger.error(f"❌ State not found for session {session_id}")
-            return False 
-        updates = {
-            "current_message": message,
-            "message_type": message_type,
-            "current_state": AgentState.PROCESSING
-        }
-        if metadata:
-            updates["metadata"].update(metadata)
-        self.state_manager.update_state(session_id, updates)
-        asyncio.create_task(self._resume_workflow(session_id))
-        self.logger.debug(f"Message queued for processing in session {session_id}")
+        user_phone = workflow.user_phone
+        self.logger.info("💬 Processing message in session %s from %s: %s", session_id, user_phone, message)
+        workflow.last_activity = time.monotonic()
+        self.active_workflows.touch(session_id)
+        workflow.message_count += 1
+        if not await self.state_manager.restore_state(session_id):
+            self.logger.error("❌ State not found for session %s", session_id)
+            return False
+        
+        def apply(state: AgentGraphState):
+            state["message_type"] = message_type
+            state["current_state"] = AgentStateType.PROCESSING
+            if metadata:
+                state.setdefault("metadata", {}).update(metadata)
+                
+        self.state_manager.mutate_state(session_id, apply, "message_type", "current_state", "metadata")
+        self._pending_messages.setdefault(session_id, []).append(message)
+        if session_id not in self._debounce_tasks:
+            self._debounce_tasks[session_id] = self._spawn(self._flush_messages(session_id))
+        self.logger.debug("Message queued for processing in session %s", session_id)
         return True
         
+    async def _flush_messages(self, session_id: str):
+        """Wait out the batch window, then queue a resume that answers all pending messages in one graph run."""
+        try:
+            await asyncio.sleep(MESSAGE_BATCH_WINDOW_S)
+        finally:
+            self._debounce_tasks.pop(session_id, None)
+        if session_id in self._pending_messages and session_id in self.active_workflows:
+            await self._work_q.put((session_id, None))
+        
+    def has_session(self, session_id: str) -> bool:
+        """Whether a session is active; probes only the session's shard."""
+        return session_id in self.active_workflows
+        
     async def get_session_status(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get status of a workflow session."""
-        if session_id not in self.active_workflows:
+        return self._session_status(session_id)
+        
+    def _session_status(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Build a session's status dict; pure bookkeeping, so it needs no await."""
+        workflow_info = self.active_workflows.get(session_id)
+        if workflow_info is None:
             return None
-        workflow_info = self.active_workflows[session_id]
         state_summary = self.state_manager.get_session_summary(session_id)
         return {
-            **workflow_info,
-            **state_summary,
-            "duration_minutes": (datetime.utcnow() - workflow_info["start_time"]).total_seconds() / 60
+            **workflow_info.to_dict(),
+            **(state_summary or {}),
+            "duration_minutes": (time.monotonic() - workflow_info.start_time) / 60
         }
         
     async def stop_session(self, session_id: str, reason: str = "user_request") -> bool:
         """Stop an active workflow session."""
         if session_id not in self.active_workflows:
             return False
-        self.logger.info(f"Stopping session {session_id}, reason: {reason}")
-        self.active_workflows[session_id]["status"] = "stopped"
-        self.active_workflows[session_id]["stop_reason"] = reason
+        self.logger.info("Stopping session %s, reason: %s", session_id, reason)
+        workflow = self.active_workflows[session_id]
+        workflow.status = "stopped"
+        workflow.stop_reason = reason
+        debounce_task = self._debounce_tasks.pop(session_id, None)
+        if debounce_task:
+            debounce_task.cancel()
+        self._pending_messages.pop(session_id, None)
+        await self.state_manager.persist(session_id)
         self.state_manager.cleanup_session(session_id)
+        self.tool_registry.clear_session_cache(session_id)
         del self.active_workflows[session_id]
         return True
         
     async def get_active_sessions(self) -> List[Dict[str, Any]]:
         """Get list of all active sessions."""
+        session_ids = list(self.active_workflows)
         sessions = []
-        for session_id in self.active_workflows:
-            status = await self.get_session_status(session_id)
-            if status:
-                sessions.append(status)
+        for start in range(0, len(session_ids), STATUS_BATCH_SIZE):
+            if start:
+                # Yield between batches so a large listing does not stall message handling
+                await asyncio.sleep(0)
+            sessions.extend(filter(None, map(self._session_status, session_ids[start:start + STATUS_BATCH_SIZE])))
         return sessions
         
     async def get_metrics(self) -> Dict[str, Any]:
         """Get workflow manager metrics."""
         return {
-            **self.metrics,
+            "total_sessions": self._total_sessions,
+            "successful_sessions": self._successful_sessions,
+            "failed_sessions": self._failed_sessions,
+            "average_session_duration": self._average_session_duration,
+            "tool_usage_count": dict(self._tool_usage_count),
+            "error_count": self._error_count,
+            "messages_sent": self._messages_sent,
+            "failed_messages": self._failed_messages,
             "active_sessions": len(self.active_workflows),
             "max_concurrent_sessions": self.max_concurrent_sessions
         }
         
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get session pool occupancy for operators."""
+        oldest = self.active_workflows.oldest()
+        return {
+            "active_sessions": len(self.active_workflows),
+            "max_concurrent_sessions": self.max_concurrent_sessions,
+            "queued_runs": self._work_q.qsize(),
+            "oldest_idle_seconds": time.monotonic() - oldest.last_activity if oldest else 0.0
+        }
+        
+    async def _worker(self):
+        """Run queued workflow executions; a None state resumes the session from the state manager."""
+        while True:
+            session_id, state = await self._work_q.get()
+            try:
+                await self._run_workflow(session_id, state)
+            finally:
+                self._work_q.task_done()
+                
+    async def _run_workflow(self, session_id: str, state: Optional[AgentGraphState]):
+        """Execute or resume a session while counting it against the concurrency limit."""
+        self._running += 1
+        try:
+            if state is None:
+                await self._resume_workflow(session_id)
+            else:
+                await self._execute_workflow(session_id, state)
+        finally:
+            self._running -= 1
+                
+    async def _invoke_graph(self, session_id: str, state: AgentGraphState):
+        """Run the graph once and handle its result; callers hold the session lock."""
+        self.logger.info("Executing workflow for session %s", session_id)
+        result = await self._graph.ainvoke(state)
+        await self._handle_workflow_result(session_id, result)
+                
     async def _execute_workflow(self, session_id: str, initial_state: AgentGraphState):
-        """Execute the agent workflow."""
+        """Execute the agent workflow, one run per session at a time."""
         try:
-            self.logger.info(f"Executing workflow for session {session_id}")
-            graph = self.graph_builder.get_compiled_graph()
-            result = await graph.ainvoke(initial_state)
-            await self._handle_workflow_result(session_id, result)
+            async with self.state_manager.run_lock(session_id):
+                await self._invoke_graph(session_id, initial_state)
         except Exception as e:
-            self.logger.error(f"Workflow execution error for session {session_id}: {str(e)}")
+            self.logger.error("Workflow execution error for session %s: %s", session_id, e)
             await self._handle_workflow_error(session_id, str(e))
             
     async def _resume_workflow(self, session_id: str):
-        """Resume workflow execution after new message."""
+        """Resume workflow execution with the messages received since the last run."""
         try:
-            state = self.state_manager.get_state(session_id)
-            if not state:
-                return
-            if state["current_state"] in [AgentState.WAITING_FOR_INPUT, AgentState.PROCESSING]:
-                await self._execute_workflow(session_id, state)
+            async with self.state_manager.run_lock(session_id):
+                # Taken under the lock so input that arrived during the previous run is answered by this one,
+                # whatever state that run left behind; a resume finding nothing pending was already served
+                messages = self._pending_messages.pop(session_id, None)
+                if not messages or session_id not in self.active_workflows:
+                    return
+                state = self.state_manager.get_state(session_id) or await self.state_manager.restore_state(session_id)
+                if not state:
+                    return
+                self.state_manager.update_state(session_id, {"current_message": "\n".join(messages), "current_state": AgentStateType.PROCESSING})
+                self.state_manager.commit(session_id)
+                await self._invoke_graph(session_id, state)
         except Exception as e:
-            self.logger.error(f"Workflow resume error for session {session_id}: {str(e)}")
+            self.logger.error("Workflow resume error for session %s: %s", session_id, e)
             await self._handle_workflow_error(session_id, str(e))
             
     async def _handle_workflow_result(self, session_id: str, result: AgentGraphState):
@@ -166,54 +378,57 @@ class WorkflowManager:
             workflow = self.active_workflows.get(session_id)
             if not workflow:
                 return
-            workflow["last_activity"] = datetime.utcnow()
-            user_phone = workflow["user_phone"]
-            self.state_manager.update_state(session_id, {"current_state": result["current_state"], "updated_at": datetime.utcnow()})
+            workflow.last_activity = time.monotonic()
+            self.active_workflows.touch(session_id)
+            user_phone = workflow.user_phone
+            self.state_manager.update_state(session_id, {"current_state": result["current_state"]})
+            # Graph nodes mutate metadata in place, so it is written alongside the tracked changes
+            await self.state_manager.persist(session_id, "metadata")
             response_text = result.get("response") or result["metadata"].get("final_response")
             if not response_text:
-                response_text = "I've processed your message. How can I help you further?"
-            self.logger.info(f"📤 SENDING WhatsApp response to {user_phone}: {response_text}")
+                response_text = _DEFAULT_RESPONSE
+            self.logger.info("📤 SENDING WhatsApp response to %s: %s", user_phone, response_text)
             await self._send_whatsapp_response(user_phone, response_text)
-            if result["current_state"] == AgentState.WAITING_FOR_INPUT:
-                workflow["status"] = "waiting"
-            elif result["current_state"] == AgentState.ERROR:
-                workflow["status"] = "failed"
-                self.metrics["failed_sessions"] += 1
+            if result["current_state"] == AgentStateType.WAITING_FOR_INPUT:
+                workflow.status = "waiting"
+            elif result["current_state"] == AgentStateType.ERROR:
+                workflow.status = "failed"
+                self._failed_sessions += 1
             else:
-                workflow["status"] = "completed"
-                self.metrics["successful_sessions"] += 1
-            duration = (datetime.utcnow() - workflow["start_time"]).total_seconds()
+                workflow.status = "completed"
+                self._successful_sessions += 1
+            duration = time.monotonic() - workflow.start_time
             self._update_average_duration(duration)
+            tool_usage_count = self._tool_usage_count
             for tool_name in result.get("tool_results", {}):
-                self.metrics["tool_usage_count"][tool_name] = (self.metrics["tool_usage_count"].get(tool_name, 0) + 1)
+                tool_usage_count[tool_name] = tool_usage_count.get(tool_name, 0) + 1
         except Exception as e:
-            self.logger.error(f"❌ Error handling workflow result: {str(e)}")
+            self.logger.error("❌ Error handling workflow result: %s", e)
             await self._handle_workflow_error(session_id, str(e))
             
     async def _handle_workflow_error(self, session_id: str, error: str):
         """Handle workflow execution error."""
-        self.logger.error(f"Workflow error for session {session_id}: {error}")
-        self.metrics["error_count"] += 1
+        self.logger.error("Workflow error for session %s: %s", session_id, error)
+        self._error_count += 1
         if session_id in self.active_workflows:
             workflow = self.active_workflows[session_id]
-            workflow["status"] = "failed"
-            workflow["error"] = error
-            user_phone = workflow["user_phone"]
-            self.logger.error(f"❌ Workflow error for session {session_id} (user: {user_phone}): {error}")
-            error_message = "I encountered an error processing your request. Please try again or contact support if the issue persists."
-            self.logger.info(f"📤 SENDING error response to {user_phone}")
-            self.metrics["failed_sessions"] += 1
+            workflow.status = "failed"
+            workflow.error = error
+            user_phone = workflow.user_phone
+            self.logger.error("❌ Workflow error for session %s (user: %s): %s", session_id, user_phone, error)
+            self.logger.info("📤 SENDING error response to %s", user_phone)
+            self._failed_sessions += 1
         try:
-            state = self.state_manager.get_state(session_id)
+            state = await self.state_manager.restore_state(session_id)
             if state:
-                await self._send_whatsapp_response(state["user_phone"], error_message if session_id in self.active_workflows else "I'm experiencing technical difficulties. Please try again later.")
+                await self._send_whatsapp_response(state["user_phone"], _ERR_RETRY if session_id in self.active_workflows else _ERR_GENERIC)
         except Exception as e:
-            self.logger.error(f"❌ Failed to send error message: {str(e)}")
+            self.logger.error("❌ Failed to send error message: %s", e)
             
     async def _send_whatsapp_response(self, user_phone: str, message: str):
         """Send WhatsApp response to user."""
         try:
-            self.logger.debug(f"Attempting to send WhatsApp message to {user_phone}")
+            self.logger.debug("Attempting to send WhatsApp message to %s", user_phone)
             result = await self.mcp_manager.call_tool(
                 "whatsapp-mcp",
                 "send_message",
@@ -223,23 +438,25 @@ class WorkflowManager:
                 }
             )
             if result.get("success", False):
-                self.logger.info(f"✅ WhatsApp message sent successfully to {user_phone}")
-                self.logger.debug(f"Message content: {message}")
-                self.metrics["messages_sent"] = self.metrics.get("messages_sent", 0) + 1
+                self.logger.info("✅ WhatsApp message sent successfully to %s", user_phone)
+                self.logger.debug("Message content: %s", message)
+                self._messages_sent += 1
             else:
-                self.logger.error(f"❌ Failed to send WhatsApp message to {user_phone}: {result}")
-                self.metrics["failed_messages"] = self.metrics.get("failed_messages", 0) + 1
+                self.logger.error("❌ Failed to send WhatsApp message to %s: %s", user_phone, result)
+                self._failed_messages += 1
         except Exception as e:
-            self.logger.error(f"❌ WhatsApp send error to {user_phone}: {str(e)}")
-            self.metrics["failed_messages"] = self.metrics.get("failed_messages", 0) + 1
+            self.logger.error("❌ WhatsApp send error to %s: %s", user_phone, e)
+            self._failed_messages += 1
             
     def _update_average_duration(self, duration: float):
-        """Update average session duration metric."""
-        total_completed = self.metrics["successful_sessions"] + self.metrics["failed_sessions"]
-        if total_completed > 0:
-            current_avg = self.metrics["average_session_duration"]
-            self.metrics["average_session_duration"] = ((current_avg * (total_completed - 1) + duration) / total_completed)
+        """Update average session duration metric as a running mean."""
+        self._timed_sessions += 1
+        self._average_session_duration += (duration - self._average_session_duration) / self._timed_sessions
             
+    def _spawn(self, coro) -> asyncio.Task:
+        """Schedule a long-lived background task in a fresh empty context instead of a copy of the caller's."""
+        return asyncio.get_running_loop().create_task(coro, context=contextvars.Context())
+        
     def _start_cleanup_task(self):
         """Start background cleanup task."""
         async def cleanup_expired_sessions():
@@ -248,19 +465,15 @@ class WorkflowManager:
                     await asyncio.sleep(300)  # Check every 5 minutes
                     await self._cleanup_expired_sessions()
                 except Exception as e:
-                    self.logger.error(f"Cleanup task error: {str(e)}")
+                    self.logger.error("Cleanup task error: %s", e)
                     
-        self._cleanup_task = asyncio.create_task(cleanup_expired_sessions())
+        self._cleanup_task = self._spawn(cleanup_expired_sessions())
         
     async def _cleanup_expired_sessions(self):
         """Clean up expired sessions."""
-        now = datetime.utcnow()
-        expired_sessions = []
-        for session_id, workflow in self.active_workflows.items():
-            if now - workflow["last_activity"] > self.session_timeout:
-                expired_sessions.append(session_id)
-        for session_id in expired_sessions:
-            self.logger.info(f"Cleaning up expired session: {session_id}")
+        cutoff = time.monotonic() - self._session_timeout_s
+        for session_id in self.active_workflows.idle_since(cutoff):
+            self.logger.info("Cleaning up expired session: %s", session_id)
             await self.stop_session(session_id, "timeout")
             
     async def shutdown(self):
@@ -268,10 +481,16 @@ class WorkflowManager:
         self.logger.info("Shutting down workflow manager")
         if self._cleanup_task:
             self._cleanup_task.cancel()
-        active_sessions = list(self.active_workflows.keys())
-        for session_id in active_sessions:
-            await self.stop_session(session_id, "shutdown")
-        self.executor.shutdown(wait=True)
+        for worker in self._workers:
+            worker.cancel()
+        results = await asyncio.gather(*(self.stop_session(session_id, "shutdown") for session_id in list(self.active_workflows)), return_exceptions=True)
+        for error in results:
+            if isinstance(error, Exception):
+                self.logger.error("Failed to stop session during shutdown: %s", error)
+        if self.state_manager.backend:
+            await self.state_manager.backend.close()
+        if self._owned_redis is not None:
+            await self._owned_redis.aclose()
         self.logger.info("Workflow manager shutdown complete")
 
 
@@ -283,18 +502,18 @@ class AutonomousAgent:
         self.logger = logging.getLogger(__name__)
         self.workflow_manager = WorkflowManager(mcp_manager=mcp_manager, openai_api_key=openai_api_key, settings=settings, **kwargs)
         
-    async def process_message(self, user_phone: str, message: str, message_type: str = "text", session_id: Optional[str] = None, context: Optional[Dict[str, Any]] = None) -> str:
-        """Process incoming message from user."""
+    async def process_message(self, user_phone: str, message: str, message_type: str = "text", session_id: Optional[str] = None, context: Optional[Dict[str, Any]] = None, wait: bool = False) -> str:
+        """Process incoming message from user; wait runs a new session's first turn inline when capacity allows."""
         try:
-            if session_id and session_id in self.workflow_manager.active_workflows:
+            if session_id and self.workflow_manager.has_session(session_id):
                 success = await self.workflow_manager.send_message(session_id, message, message_type, context)
                 if not success:
-                    session_id = await self.workflow_manager.start_workflow(user_phone, message, context)
+                    session_id = await self.workflow_manager.start_workflow(user_phone, message, context, wait=wait)
             else:
-                session_id = await self.workflow_manager.start_workflow(user_phone, message, context, session_id)
+                session_id = await self.workflow_manager.start_workflow(user_phone, message, context, session_id, wait=wait)
             return session_id
         except Exception as e:
-            self.logger.error(f"Message processing error: {str(e)}")
+            self.logger.error("Message processing error: %s", e)
             raise
             
     async def get_session_status(self, session_id: str) -> Optional[Dict[str, Any]]:
@@ -309,6 +528,10 @@ class AutonomousAgent:
         """Get agent metrics."""
         return await self.workflow_manager.get_metrics()
         
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get session pool occupancy."""
+        return self.workflow_manager.get_pool_stats()
+        
     async def shutdown(self):
         """Shutdown the agent."""
         await self.workflow_manager.shutdown()
\ No newline at end of file
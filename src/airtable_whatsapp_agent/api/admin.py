@@ -3,62 +3,76 @@ Simplified admin API endpoints for monitoring.
 """
 
 import logging
-from typing import Dict
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from .app_state import get_app_state
+from typing import Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict
+from .app_state import STATE, get_agent, get_mcp_manager, get_settings
+from .cache import cache_response, load_last_good, store_last_good, CONFIG_TTL_SECONDS, METRICS_TTL_SECONDS
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+class SessionPoolStats(BaseModel):
+    """Session pool occupancy model."""
+    model_config = ConfigDict(frozen=True)
+    active_sessions: int
+    max_concurrent_sessions: int
+    queued_runs: int
+    oldest_idle_seconds: float
+
+
 class SystemMetrics(BaseModel):
     """System metrics response model."""
+    model_config = ConfigDict(frozen=True)
     active_sessions: int
     total_messages_processed: int
     total_errors: int
     uptime_seconds: float
     memory_usage_mb: float
     mcp_server_status: Dict[str, str]
+    session_pool: Optional[SessionPoolStats] = None
 
 
-@router.get("/metrics", response_model=SystemMetrics)
-async def get_system_metrics():
+@router.get("/metrics", response_model=SystemMetrics, dependencies=[Depends(get_mcp_manager)])
+# Session and pool figures describe this worker only, so each process caches its own
+@cache_response("metrics", expire=METRICS_TTL_SECONDS, per_process=True)
+async def get_system_metrics(agent=Depends(get_agent)):
     """Get system metrics and status."""
     try:
-        app_state = get_app_state()
-        agent = app_state.get("agent")
-        mcp_manager = app_state.get("mcp_manager")
-        if not agent or not mcp_manager:
-            raise HTTPException(status_code=500, detail="Services unavailable")
         agent_metrics = await agent.get_metrics()
-        mcp_health = await mcp_manager.health_check()
+        mcp_health = STATE.mcp_health
         mcp_status = {
             "airtable": "healthy" if mcp_health else "unhealthy",
             "whatsapp": "healthy" if mcp_health else "unhealthy"
         }
-        return SystemMetrics(
+        metrics = SystemMetrics(
             active_sessions=agent_metrics.get("active_sessions", 0),
             total_messages_processed=agent_metrics.get("total_messages", 0),
             total_errors=agent_metrics.get("total_errors", 0),
             uptime_seconds=agent_metrics.get("uptime_seconds", 0),
             memory_usage_mb=agent_metrics.get("memory_usage_mb", 0),
-            mcp_server_status=mcp_status
+            mcp_server_status=mcp_status,
+            session_pool=SessionPoolStats(**agent.get_pool_stats())
         )
-    except HTTPException:
-        raise
+        await store_last_good("metrics", metrics, fresh_for=METRICS_TTL_SECONDS, per_process=True)
+        return metrics
     except Exception as e:
         logger.error(f"Error getting system metrics: {str(e)}")
+        # Dashboards keep the last known values through brief outages
+        stale = await load_last_good("metrics", per_process=True)
+        if stale is not None:
+            return ORJSONResponse(content=stale, headers={"X-Cache-Stale": "true"})
+        if isinstance(e, HTTPException):
+            raise
         raise HTTPException(status_code=500, detail="Error retrieving metrics")
 
 
 @router.get("/config")
-async def get_config():
+@cache_response("config", expire=CONFIG_TTL_SECONDS)
+async def get_config(settings=Depends(get_settings)):
     """Get non-sensitive configuration information."""
     try:
-        app_state = get_app_state()
-        settings = app_state.get("settings")
-        if not settings:
-            raise HTTPException(status_code=500, detail="Configuration unavailable")
         return {
             "environment": getattr(settings, "environment", "development"),
             "debug": getattr(settings, "debug", False),
@@ -3,32 +3,74 @@ Application state management module.
 Separated from main.py to avoid circular imports.
 """
 
-from typing import Dict, Any
+import asyncio
+from dataclasses import dataclass, field, fields
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from fastapi import HTTPException
+
+if TYPE_CHECKING:
+    import redis.asyncio as redis
+    from ..agent import AutonomousAgent
+    from ..config import Settings
+    from ..mcp import MCPServerManager
+
+
+@dataclass(slots=True)
+class AppState:
+    """Services and shared values of the running application."""
+    agent: Optional["AutonomousAgent"] = None
+    mcp_manager: Optional["MCPServerManager"] = None
+    settings: Optional["Settings"] = None
+    redis: Optional["redis.Redis"] = None
+    mcp_health: Dict[str, bool] = field(default_factory=dict)
+    bg_tasks: List[asyncio.Task] = field(default_factory=list)
+
+    def __getitem__(self, key: str) -> Any:
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style read kept for callers written against the old state dict."""
+        return getattr(self, key, default)
 
 
 # Global application state
-app_state: Dict[str, Any] = {
-    "agent": None,
-    "mcp_manager": None,
-    "settings": None
-}
+STATE = AppState()
 
 
-def get_app_state() -> Dict[str, Any]:
+def get_app_state() -> AppState:
     """Get application state."""
-    return app_state
+    return STATE
+
+
+def _require(value: Any) -> Any:
+    """Pass a service through, or fail the request if it is not up yet."""
+    if value is None:
+        raise HTTPException(status_code=503, detail="Services unavailable")
+    return value
+
+
+async def get_agent() -> "AutonomousAgent":
+    """Dependency providing the running agent."""
+    return _require(STATE.agent)
+
+
+async def get_mcp_manager() -> "MCPServerManager":
+    """Dependency providing the MCP server manager."""
+    return _require(STATE.mcp_manager)
+
+
+async def get_settings() -> "Settings":
+    """Dependency providing the application settings."""
+    return _require(STATE.settings)
 
 
 def set_app_state(key: str, value: Any) -> None:
     """Set a value in the application state."""
-    app_state[key] = value
+    setattr(STATE, key, value)
 
 
 def clear_app_state() -> None:
     """Clear all application state."""
-    global app_state
-    app_state = {
-        "agent": None,
-        "mcp_manager": None,
-        "settings": None
-    }
\ No newline at end of file
+    defaults = AppState()
+    for state_field in fields(AppState):
+        setattr(STATE, state_field.name, getattr(defaults, state_field.name))
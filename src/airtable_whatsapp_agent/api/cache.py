@@ -0,0 +1,108 @@
+"""
+Short-lived Redis cache for polled read-only endpoints.
+Only aggregate status payloads are cached; session and other per-user data must not go through here.
+Payloads describing a single worker process are keyed per process, or memoized in process.
+"""
+
+import functools
+import logging
+import os
+import socket
+import time
+from typing import Any, Awaitable, Callable, Optional
+import orjson
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from .app_state import STATE
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "awa-cache:"
+HEALTH_TTL_SECONDS = 5
+METRICS_TTL_SECONDS = 15
+CONFIG_TTL_SECONDS = 60
+# How long a last-known-good payload is kept for serving while its source is failing
+STALE_TTL_SECONDS = 3600
+
+_HOSTNAME = socket.gethostname()
+
+
+def _cache_key(name: str, per_process: bool) -> str:
+    """Redis key for a cached payload; per-process keys carry host and pid (read at call time, workers may fork after import)."""
+    return f"{CACHE_PREFIX}{name}:{_HOSTNAME}:{os.getpid()}" if per_process else f"{CACHE_PREFIX}{name}"
+
+
+def cache_response(name: str, expire: int, per_process: bool = False) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """Serve an endpoint's JSON payload from Redis for `expire` seconds; falls through when Redis is unavailable."""
+
+    def decorator(endpoint: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(endpoint)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            redis_client = STATE.redis
+            key = _cache_key(name, per_process)
+            if redis_client is not None:
+                try:
+                    cached = await redis_client.get(key)
+                    if cached is not None:
+                        return orjson.loads(cached)
+                except Exception as e:
+                    logger.warning("Response cache read failed for %s: %s", name, e)
+            result = await endpoint(*args, **kwargs)
+            # Explicit responses carry error statuses, which should not be replayed
+            if redis_client is not None and not isinstance(result, Response):
+                try:
+                    await redis_client.set(key, orjson.dumps(jsonable_encoder(result)), ex=expire)
+                except Exception as e:
+                    logger.warning("Response cache write failed for %s: %s", name, e)
+            return result
+        return wrapper
+    return decorator
+
+
+def memo_response(expire: float) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """Reuse an endpoint's payload within this process for `expire` seconds."""
+
+    def decorator(endpoint: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        memo: list = [0.0, None]
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            now = time.monotonic()
+            if memo[1] is not None and now < memo[0]:
+                return memo[1]
+            result = await endpoint(*args, **kwargs)
+            # Explicit responses carry error statuses, which should not be replayed
+            if not isinstance(result, Response):
+                memo[:] = [now + expire, result]
+            return result
+        return wrapper
+    return decorator
+
+
+async def store_last_good(name: str, payload: Any, fresh_for: int, per_process: bool = False) -> None:
+    """Keep the latest successful payload with its generation and staleness timestamps."""
+    redis_client = STATE.redis
+    if redis_client is None:
+        return
+    key = f"{_cache_key(name, per_process)}:last"
+    now = time.time()
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.hset(key, mapping={"generated_at": now, "stale_at": now + fresh_for, "body": orjson.dumps(jsonable_encoder(payload))})
+            pipe.expire(key, STALE_TTL_SECONDS)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning("Failed to store last good %s payload: %s", name, e)
+
+
+async def load_last_good(name: str, per_process: bool = False) -> Optional[Any]:
+    """Get the last successful payload stored by store_last_good, if any."""
+    redis_client = STATE.redis
+    if redis_client is None:
+        return None
+    try:
+        body = await redis_client.hget(f"{_cache_key(name, per_process)}:last", "body")
+    except Exception as e:
+        logger.warning("Failed to load last good %s payload: %s", name, e)
+        return None
+    return orjson.loads(body) if body is not None else None
@@ -2,44 +2,77 @@
 Main FastAPI application setup.
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from datetime import datetime
-from fastapi import FastAPI, Request, HTTPException
+from functools import lru_cache
+import orjson
+from fastapi import FastAPI, Request, Response
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 import uvicorn
+import redis.asyncio as redis
 from .webhooks import router as webhooks_router
 from .admin import router as admin_router
 from .middleware import setup_middleware
-from .app_state import get_app_state, set_app_state
+from .app_state import STATE
+from .cache import memo_response, HEALTH_TTL_SECONDS
 from ..agent import AutonomousAgent
 from ..mcp import MCPServerManager
-from ..config import Settings
+from ..config import settings as default_settings
+from .. import install_uvloop
 from ..utils.logging import configure_logging
 
 
 logger = logging.getLogger(__name__)
 
+HEALTH_PROBE_INTERVAL_SECONDS = 10
+
+_WEBHOOKS_PREFIX = f"{default_settings.api_v1_str}/webhooks"
+_ADMIN_PREFIX = f"{default_settings.api_v1_str}/admin"
+_ERR_500 = orjson.dumps({"error": "Internal server error", "message": "An unexpected error occurred"})
+
+
+@lru_cache(maxsize=256)
+def _http_error_body(status_code: int, detail: str) -> bytes:
+    """Serialized error body; the same few status/detail pairs repeat across requests."""
+    return orjson.dumps({"error": detail, "status_code": status_code})
+
+
+async def _refresh_mcp_health(mcp_manager: MCPServerManager) -> None:
+    """Probe MCP servers periodically so requests read the last result instead of probing themselves."""
+    while True:
+        try:
+            STATE.mcp_health = await mcp_manager.health_check()
+        except Exception as e:
+            logger.error("MCP health probe failed: %s", e)
+            STATE.mcp_health = {}
+        await asyncio.sleep(HEALTH_PROBE_INTERVAL_SECONDS)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
-    settings = Settings()
+    # create_app already stored the shared instance; env/dotenv is parsed once per process
+    settings = STATE.settings or default_settings
     configure_logging(level="DEBUG", format_type="colored" if settings.is_development else "structured", log_file=None)
     logger.info("Starting up application...")
     try:
-        set_app_state("settings", settings)
+        STATE.settings = settings
+        STATE.redis = redis.from_url(settings.redis_url)
         mcp_manager = MCPServerManager(settings)
         await mcp_manager.initialize()
-        set_app_state("mcp_manager", mcp_manager)
+        STATE.mcp_manager = mcp_manager
+        STATE.bg_tasks = [asyncio.create_task(_refresh_mcp_health(mcp_manager))]
         agent = AutonomousAgent(
             mcp_manager=mcp_manager, 
             openai_api_key=settings.openai_api_key,
             settings=settings,
-            max_concurrent_sessions=settings.max_concurrent_sessions
+            max_concurrent_sessions=settings.max_concurrent_sessions,
+            redis_client=STATE.redis
         )
-        set_app_state("agent", agent)
+        STATE.agent = agent
         logger.info("Application startup complete")
         yield
     except Exception as e:
@@ -47,11 +80,14 @@ async def lifespan(app: FastAPI):
         raise
     logger.info("Shutting down application...")
     try:
-        current_state = get_app_state()
-        if current_state["agent"]:
-            await current_state["agent"].shutdown()
-        if current_state["mcp_manager"]:
-            await current_state["mcp_manager"].shutdown()
+        for task in STATE.bg_tasks:
+            task.cancel()
+        if STATE.agent:
+            await STATE.agent.shutdown()
+        if STATE.mcp_manager:
+            await STATE.mcp_manager.shutdown()
+        if STATE.redis:
+            await STATE.redis.aclose()
         logger.info("Application shutdown complete")
     except Exception as e:
         logger.error(f"Shutdown error: {str(e)}")
@@ -62,37 +98,40 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title="Airtable WhatsApp Agent",
         description="Autonomous AI agent for WhatsApp and Airtable integration",
-        lifespan=lifespan
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse
     )
-    local_settings = Settings()
+    local_settings = STATE.settings or default_settings
+    STATE.settings = local_settings
     setup_middleware(
         app,
         webhook_verify_token=local_settings.whatsapp_webhook_verify_token,
         rate_limit_per_minute=local_settings.rate_limit_per_minute,
         webhook_url=local_settings.whatsapp_webhook_url,
     )
-    app.include_router(webhooks_router, prefix=f"{local_settings.api_v1_str}/webhooks", tags=["webhooks"])
-    app.include_router(admin_router, prefix=f"{local_settings.api_v1_str}/admin", tags=["admin"])
+    app.include_router(webhooks_router, prefix=_WEBHOOKS_PREFIX, tags=["webhooks"])
+    app.include_router(admin_router, prefix=_ADMIN_PREFIX, tags=["admin"])
 
     @app.get("/health")
+    # The payload describes this process, so it is memoized locally rather than shared through Redis
+    @memo_response(expire=HEALTH_TTL_SECONDS)
     async def health_check():
         """Health check endpoint."""
         try:
-            current_state = get_app_state()
-            mcp_health = await current_state["mcp_manager"].health_check() if current_state["mcp_manager"] else False
-            agent_metrics = await current_state["agent"].get_metrics() if current_state["agent"] else {}
+            mcp_health = STATE.mcp_health if STATE.mcp_manager else False
+            agent_metrics = await STATE.agent.get_metrics() if STATE.agent else {}
             return {
                 "status": "healthy" if mcp_health else "degraded",
                 "timestamp": datetime.now().isoformat(),
                 "services": {
                     "mcp_manager": "healthy" if mcp_health else "unhealthy",
-                    "agent": "healthy" if current_state["agent"] else "unhealthy"
+                    "agent": "healthy" if STATE.agent else "unhealthy"
                 },
                 "metrics": agent_metrics
             }
         except Exception as e:
             logger.error(f"Health check error: {str(e)}")
-            return JSONResponse(status_code=503, content={"status": "unhealthy", "error": str(e)})
+            return ORJSONResponse(status_code=503, content={"status": "unhealthy", "error": str(e)})
 
     @app.get("/")
     async def root():
@@ -108,28 +147,31 @@ def create_app() -> FastAPI:
     async def global_exception_handler(request: Request, exc: Exception):
         """Global exception handler."""
         logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
-        return JSONResponse(status_code=500, content={"error": "Internal server error", "message": "An unexpected error occurred"})
-
-    @app.exception_handler(HTTPException)
-    async def http_exception_handler(request: Request, exc: HTTPException):
-        """HTTP exception handler."""
-        return JSONResponse(status_code=exc.status_code, content={"error": exc.detail, "status_code": exc.status_code})
+        return Response(_ERR_500, status_code=500, media_type="application/json")
 
+    # Also covers FastAPI's HTTPException, which subclasses Starlette's
     @app.exception_handler(StarletteHTTPException)
-    async def starlette_http_exception_handler(request: Request, exc: StarletteHTTPException):
-        """Starlette HTTP exception handler."""
-        return JSONResponse(status_code=exc.status_code, content={"error": exc.detail, "status_code": exc.status_code})
+    async def http_exception_handler(request: Request, exc: StarletteHTTPException):
+        """HTTP exception handler."""
+        detail = exc.detail
+        body = _http_error_body(exc.status_code, detail) if isinstance(detail, str) else orjson.dumps({"error": detail, "status_code": exc.status_code})
+        return Response(body, status_code=exc.status_code, headers=getattr(exc, "headers", None), media_type="application/json")
 
     return app
 
 
-def run_server(host: str = "0.0.0.0", port: int = 8000, reload: bool = False, log_level: str = "debug"):
+def run_server(host: str = "0.0.0.0", port: int = 8000, reload: bool = False, log_level: str = "debug", workers: int = 1):
     """Run the FastAPI server."""
+    has_uvloop = install_uvloop()
     uvicorn.run(
         "airtable_whatsapp_agent.api.main:create_app",
         factory=True,
         host=host,
         port=port,
         reload=reload,
-        log_level=log_level
+        # Reload watches a single process
+        workers=workers if not reload else 1,
+        log_level=log_level,
+        loop="uvloop" if has_uvloop else "asyncio",
+        http="httptools"
     )
\ No newline at end of file
@@ -5,17 +5,21 @@ WhatsApp webhook handlers.
 import logging
 from typing import Dict, Any, Optional
 import asyncio
+import hmac
 import json
-from fastapi import APIRouter, Request, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, Request, HTTPException, Query, BackgroundTasks
 from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, Field
-from .app_state import get_app_state
+from .app_state import STATE, get_settings
 from ..models import WhatsAppMessage, WhatsAppWebhook
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+_QUEUED_RESPONSE = {"status": "success", "message": "Webhook event queued for processing"}
+_TEST_QUEUED_RESPONSE = {"status": "success", "message": "Test event queued for processing"}
+
 
 class WebhookVerification(BaseModel):
     """WhatsApp webhook verification model."""
@@ -59,8 +63,7 @@ class WhatsAppWebhookHandler:
     async def _handle_event(self, event: WhatsAppWebhook):
         """Handle a single webhook event."""
         try:
-            app_state = get_app_state()
-            agent = app_state.get("agent")
+            agent = STATE.agent
             if not agent:
                 logger.error("Agent not available")
                 return
@@ -139,7 +142,7 @@ webhook_handler = WhatsAppWebhookHandler()
 
 
 @router.get("/whatsapp")
-async def verify_webhook(request: Request, hub_mode: str = Query(alias="hub.mode"), hub_challenge: str = Query(alias="hub.challenge"), hub_verify_token: str = Query(alias="hub.verify_token")):
+async def verify_webhook(request: Request, hub_mode: str = Query(alias="hub.mode"), hub_challenge: str = Query(alias="hub.challenge"), hub_verify_token: str = Query(alias="hub.verify_token"), settings=Depends(get_settings)):
     """Verify WhatsApp webhook."""
     client_ip = request.client.host if request.client else "unknown"
     logger.info(f"🔍 WEBHOOK VERIFICATION: {request.method} {request.url.path} from {client_ip}")
@@ -147,16 +150,11 @@ async def verify_webhook(request: Request, hub_mode: str = Query(alias="hub.mode
     logger.debug(f"🔍 Full query params: {dict(request.query_params)}")
     logger.debug(f"🔍 Headers: {dict(request.headers)}")
     try:
-        app_state = get_app_state()
-        settings = app_state.get("settings")
-        if not settings:
-            logger.error("🔍 VERIFICATION FAILED: Settings not available")
-            raise HTTPException(status_code=500, detail="Server configuration error")
         expected_token = settings.whatsapp_webhook_verify_token
         logger.debug(f"🔍 Expected token configured: {'Yes' if expected_token else 'No'}")
-        if hub_verify_token != expected_token:
+        # Constant-time compare so response timing does not reveal how much of the token matched
+        if not hmac.compare_digest(hub_verify_token.encode("utf-8"), (expected_token or "").encode("utf-8")):
             logger.warning(f"🔍 VERIFICATION FAILED: Invalid verify token received")
-            logger.debug(f"🔍 Token comparison - received: '{hub_verify_token}', expected: '{expected_token}'")
             raise HTTPException(status_code=403, detail="Invalid verify token")
         if hub_mode != "subscribe":
             logger.warning(f"🔍 VERIFICATION FAILED: Invalid mode: {hub_mode}")
@@ -202,7 +200,7 @@ async def handle_webhook(request: Request, background_tasks: BackgroundTasks):
         await webhook_handler.start_processing()
         background_tasks.add_task(webhook_handler.queue_event, event)
         logger.info(f"📨 ✅ WEBHOOK SUCCESS: Event accepted and queued for processing")
-        return {"status": "success", "message": "Webhook event queued for processing"}
+        return _QUEUED_RESPONSE
     except HTTPException:
         raise
     except Exception as e:
@@ -232,7 +230,7 @@ async def test_webhook(test_data: Dict[str, Any]):
         event = WhatsAppWebhook(**test_data)
         await webhook_handler.start_processing()
         await webhook_handler.queue_event(event)
-        return { "status": "success", "message": "Test event queued for processing" }
+        return _TEST_QUEUED_RESPONSE
     except Exception as e:
         logger.error(f"Error testing webhook: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
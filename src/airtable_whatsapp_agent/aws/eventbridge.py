@@ -2,6 +2,8 @@
 AWS EventBridge integration for scheduled tasks and event-driven workflows.
 """
 
+import asyncio
+import functools
 import json
 import logging
 from datetime import datetime
@@ -156,6 +158,10 @@ class EventBridgeScheduler:
         self.task_handlers[function_name] = handler
         logger.info(f"Registered task handler: {function_name}")
         
+    async def _run(self, call: Callable, **kwargs) -> Any:
+        """Run a blocking boto3 call in the default executor so it does not stall the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(call, **kwargs))
+        
     async def create_schedule(self, task_name: str) -> bool:
         """Create EventBridge schedule for a task."""
         if task_name not in self.tasks:
@@ -164,12 +170,12 @@ class EventBridgeScheduler:
         task = self.tasks[task_name]
         try:
             rule_config = task.to_eventbridge_rule()
-            response = self.eventbridge_client.put_rule(**rule_config)
+            response = await self._run(self.eventbridge_client.put_rule, **rule_config)
             rule_arn = response['RuleArn']
             logger.info(f"Created EventBridge rule: {rule_arn}")
             lambda_arn = await self._ensure_lambda_function() # Create Lambda function if it doesn't exist
             target_config = task.to_target_config(lambda_arn)
-            self.eventbridge_client.put_targets(Rule=task.name, Targets=[target_config])
+            await self._run(self.eventbridge_client.put_targets, Rule=task.name, Targets=[target_config])
             await self._add_lambda_permission(task.name, rule_arn)
             logger.info(f"Successfully created schedule for task: {task_name}")
             return True
@@ -181,7 +187,7 @@ class EventBridgeScheduler:
         """Ensure Lambda function exists for task execution."""
         function_name = f"{self.settings.app_name}-scheduler"
         try:
-            response = self.lambda_client.get_function(FunctionName=function_name)
+            response = await self._run(self.lambda_client.get_function, FunctionName=function_name)
             return response['Configuration']['FunctionArn']
         except ClientError as e:
             if e.response['Error']['Code'] == 'ResourceNotFoundException':
@@ -236,7 +242,7 @@ def lambda_handler(event, context):
         }
 '''
         try:
-            response = self.lambda_client.create_function(
+            response = await self._run(self.lambda_client.create_function,
                 FunctionName=function_name,
                 Runtime='python3.9',
                 Role=f"arn:aws:iam::{self.account_id}:role/lambda-execution-role",
@@ -260,7 +266,7 @@ def lambda_handler(event, context):
         """Add permission for EventBridge to invoke Lambda."""
         function_name = f"{self.settings.app_name}-scheduler"
         try:
-            self.lambda_client.add_permission(
+            await self._run(self.lambda_client.add_permission,
                 FunctionName=function_name,
                 StatementId=f"allow-eventbridge-{rule_name}",
                 Action='lambda:InvokeFunction',
@@ -286,8 +292,8 @@ def lambda_handler(event, context):
     async def delete_schedule(self, task_name: str) -> bool:
         """Delete a schedule."""
         try:
-            self.eventbridge_client.remove_targets(Rule=task_name, Ids=[f"{task_name}-target"])
-            self.eventbridge_client.delete_rule(Name=task_name)
+            await self._run(self.eventbridge_client.remove_targets, Rule=task_name, Ids=[f"{task_name}-target"])
+            await self._run(self.eventbridge_client.delete_rule, Name=task_name)
             logger.info(f"Deleted schedule for task: {task_name}")
             return True
         except (ClientError, BotoCoreError) as e:
@@ -305,7 +311,7 @@ def lambda_handler(event, context):
     async def list_schedules(self) -> List[Dict[str, Any]]:
         """List all schedules."""
         try:
-            response = self.eventbridge_client.list_rules()
+            response = await self._run(self.eventbridge_client.list_rules)
             rules = response.get('Rules', [])
             schedules = []
             for rule in rules:
@@ -326,7 +332,7 @@ def lambda_handler(event, context):
     async def get_schedule_status(self, task_name: str) -> Optional[Dict[str, Any]]:
         """Get status of a specific schedule."""
         try:
-            response = self.eventbridge_client.describe_rule(Name=task_name)
+            response = await self._run(self.eventbridge_client.describe_rule, Name=task_name)
             return {
                 'name': response['Name'],
                 'description': response.get('Description', ''),
@@ -354,7 +360,7 @@ def lambda_handler(event, context):
                 'triggered_manually': True,
                 'timestamp': datetime.utcnow().isoformat()
             }
-            self.eventbridge_client.put_events(
+            await self._run(self.eventbridge_client.put_events,
                 Entries=[
                     {
                         'Source': f'{self.settings.app_name}.scheduler',
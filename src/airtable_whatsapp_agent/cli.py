@@ -7,6 +7,7 @@ import uvicorn
 from rich.console import Console
 from rich.table import Table
 
+from . import install_uvloop
 from .config import settings
 
 app = typer.Typer(
@@ -29,6 +30,10 @@ def run(
     console.print(f"🚀 Starting Airtable WhatsApp Agent on {host}:{port}", style="bold green")
     if settings.is_development:
         console.print("🔧 Running in development mode", style="yellow")
+    # uvloop is not available on Windows, which keeps the default asyncio loop
+    has_uvloop = install_uvloop()
+    if not has_uvloop:
+        console.print("uvloop unavailable, using the default asyncio event loop", style="dim")
     uvicorn.run(
         "airtable_whatsapp_agent.api.main:create_app",
         factory=True,
@@ -37,6 +42,8 @@ def run(
         reload=reload,
         workers=workers if not reload else 1,
         log_level=log_level,
+        loop="uvloop" if has_uvloop else "asyncio",
+        http="httptools",
     )
 
 
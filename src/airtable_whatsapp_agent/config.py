@@ -30,6 +30,9 @@ class Settings(BaseSettings):
     # Database Configuration
     database_url: str = Field(..., env="DATABASE_URL")
     redis_url: str = Field(..., env="REDIS_URL")
+    redis_session_ttl_seconds: int = Field(default=1800, env="REDIS_SESSION_TTL_SECONDS")
+    redis_history_limit: int = Field(default=100, env="REDIS_HISTORY_LIMIT")
+    sqlite_state_path: Optional[str] = Field(default=None, env="SQLITE_STATE_PATH")
     
     # OpenAI Configuration
     openai_api_key: str = Field(..., env="OPENAI_API_KEY")
@@ -5,6 +5,7 @@ External MCP client for communicating with public MCP servers.
 import logging
 from typing import Any, Dict, List, Optional
 import httpx
+import orjson
 from pydantic import BaseModel
 from .base import MCPRequest, MCPResponse
 from ..utils.error_handling import error_handler, retry_on_failure, EXTERNAL_MCP_RETRY_CONFIG, CircuitBreakerConfig
@@ -83,19 +84,24 @@ class ExternalMCPClient:
         return data.get("tools", [])
     
     @retry_on_failure(EXTERNAL_MCP_RETRY_CONFIG)
-    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any], arguments_raw: Optional[bytes] = None) -> Dict[str, Any]:
         """Call a tool on the external MCP server."""
         try:
-            response = await self.rate_limit_middleware(self._call_tool_impl)(tool_name, arguments)
+            response = await self.rate_limit_middleware(self._call_tool_impl)(tool_name, arguments, arguments_raw)
             return response
         except Exception as e:
             self.logger.error(f"Failed to call tool {tool_name} on {self.config.name}: {e}")
             raise
     
-    async def _call_tool_impl(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    async def _call_tool_impl(self, tool_name: str, arguments: Dict[str, Any], arguments_raw: Optional[bytes] = None) -> Dict[str, Any]:
         """Implementation for calling a tool."""
-        payload = {"name": tool_name, "arguments": arguments}
-        response = await self.client.post(f"{self.config.url}/mcp/callTool", json=payload)
+        if arguments_raw is not None:
+            # Splice the already-encoded arguments in instead of re-serializing them
+            content = b'{"name":' + orjson.dumps(tool_name) + b',"arguments":' + arguments_raw + b'}'
+            response = await self.client.post(f"{self.config.url}/mcp/callTool", content=content, headers={"Content-Type": "application/json"})
+        else:
+            payload = {"name": tool_name, "arguments": arguments}
+            response = await self.client.post(f"{self.config.url}/mcp/callTool", json=payload)
         response.raise_for_status()
         return response.json()
     
@@ -160,12 +166,12 @@ class ExternalMCPManager:
             self.logger.error(f"Failed to get tools for {server_name}: {e}")
             return []
     
-    async def call_tool(self, server_name: str, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    async def call_tool(self, server_name: str, tool_name: str, arguments: Dict[str, Any], arguments_raw: Optional[bytes] = None) -> Dict[str, Any]:
         """Call a tool on a specific external server."""
         client = self.clients.get(server_name)
         if not client:
             raise ValueError(f"External MCP server '{server_name}' not found")
-        return await client.call_tool(tool_name, arguments)
+        return await client.call_tool(tool_name, arguments, arguments_raw=arguments_raw)
     
     async def handle_request(self, server_name: str, request: MCPRequest) -> MCPResponse:
         """Handle MCP request for a specific external server."""
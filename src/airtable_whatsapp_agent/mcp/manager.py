@@ -72,9 +72,9 @@ class MCPServerManager:
             self.logger.error(f"Failed to configure external WhatsApp MCP server: {e}")
             raise
             
-    async def call_tool(self, server_name: str, tool_name: str, params: Dict[str, Any]) -> Any:
+    async def call_tool(self, server_name: str, tool_name: str, params: Dict[str, Any], arguments_raw: Optional[bytes] = None) -> Any:
         """Call a tool on a specific MCP server."""
-        return await self.external_manager.call_tool(server_name, tool_name, params)
+        return await self.external_manager.call_tool(server_name, tool_name, params, arguments_raw=arguments_raw)
         
     async def handle_request(self, server_name: str, request: MCPRequest) -> MCPResponse:
         """Handle MCP request for a specific server."""
@@ -100,20 +100,22 @@ class MCPServerManager:
         return all_tools
         
     async def health_check(self) -> Dict[str, bool]:
-        """Perform health check on all servers."""
+        """Perform health check on all servers concurrently."""
+        server_names = list(self.external_manager.list_servers())
+        results = await asyncio.gather(*(self._check_server(server_name) for server_name in server_names), return_exceptions=True)
         health_status = {}
-        for server_name in self.external_manager.list_servers():
-            try:
-                client = self.external_manager.get_client(server_name)
-                if client:
-                    health_status[server_name] = await client.test_connection()
-                else:
-                    health_status[server_name] = False
-            except Exception as e:
-                self.logger.error(f"Health check failed for {server_name}: {e}")
-                health_status[server_name] = False
+        for server_name, result in zip(server_names, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Health check failed for {server_name}: {result}")
+                result = False
+            health_status[server_name] = result
         return health_status
         
+    async def _check_server(self, server_name: str) -> bool:
+        """Test the connection of one server."""
+        client = self.external_manager.get_client(server_name)
+        return await client.test_connection() if client else False
+        
     async def get_server_info(self, server_name: str) -> Optional[Dict[str, Any]]:
         """Get information about a specific server."""
         client = self.external_manager.get_client(server_name)
@@ -22,6 +22,7 @@ from .whatsapp import (
 )
 from .agent import (
     AgentState,
+    AgentStateType,
     AgentAction,
     AgentResponse,
     AgentMemory,
@@ -51,6 +52,7 @@ __all__ = [
     "WhatsAppInteractiveMessage",
     # Agent models
     "AgentState",
+    "AgentStateType",
     "AgentAction",
     "AgentResponse",
     "AgentMemory",
@@ -22,6 +22,18 @@ class AgentActionType(str, Enum):
     SEARCH_RECORDS = "search_records"
     CREATE_REMINDER = "create_reminder"
     ESCALATE_ISSUE = "escalate_issue"
+    TOOL_CALL = "tool_call"
+    SEND_MESSAGE = "send_message"
+    WAIT_FOR_INPUT = "wait_for_input"
+
+
+class AgentStateType(str, Enum):
+    """Phases of the agent conversation graph."""
+    IDLE = "idle"
+    PROCESSING = "processing"
+    EXECUTING_TASK = "executing_task"
+    WAITING_FOR_INPUT = "waiting_for_input"
+    ERROR = "error"
 
 
 class AgentDecisionType(str, Enum):
@@ -93,7 +105,9 @@ class AgentAction(BaseModel):
     action_id: str = Field(..., description="Unique action identifier")
     action_type: AgentActionType = Field(..., description="Type of action")
     description: str = Field(..., description="Action description")
+    tool_name: Optional[str] = Field(None, description="Tool invoked by a tool_call action")
     parameters: Dict[str, Any] = Field(default_factory=dict, description="Action parameters")
+    parameters_raw: Optional[bytes] = Field(None, description="Original JSON encoding of parameters, forwarded without re-serialization")
     prerequisites: List[str] = Field(default_factory=list, description="Required prerequisites")
     expected_outcome: Optional[str] = Field(None, description="Expected outcome")
     confidence: ConfidenceLevel = Field(default=ConfidenceLevel.MEDIUM, description="Confidence level")
@@ -115,6 +129,7 @@ class AgentDecision(BaseModel):
     impact_analysis: Dict[str, Any] = Field(default_factory=dict, description="Impact analysis")
     timestamp: datetime = Field(default_factory=datetime.utcnow, description="Decision timestamp")
     expires_at: Optional[datetime] = Field(None, description="Decision expiration time")
+    actions: List[AgentAction] = Field(default_factory=list, description="Actions to execute for this decision")
 
 
 class AgentTask(BaseModel):
@@ -0,0 +1,40 @@
+"""
+Shared fixtures for the unit tests.
+The package builds its global Settings on import, so the required values are provided before collection.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+# Placeholders for the settings without defaults; real values in the environment take precedence
+REQUIRED_SETTINGS = {
+    "DATABASE_URL": "sqlite:///test.db",
+    "REDIS_URL": "redis://localhost:6379/15",
+    "OPENAI_API_KEY": "test-openai-key",
+    "WHATSAPP_ACCESS_TOKEN": "test-whatsapp-token",
+    "WHATSAPP_PHONE_NUMBER_ID": "000000000000000",
+    "WHATSAPP_BUSINESS_ACCOUNT_ID": "000000000000000",
+    "WHATSAPP_WEBHOOK_VERIFY_TOKEN": "test-verify-token",
+    "WHATSAPP_WEBHOOK_URL": "https://example.invalid/api/v1/webhooks/whatsapp",
+    "AIRTABLE_API_KEY": "test-airtable-key",
+    "AIRTABLE_BASE_ID": "appTEST000000000",
+}
+for name, value in REQUIRED_SETTINGS.items():
+    os.environ.setdefault(name, value)
+
+
+@pytest.fixture
+def settings(tmp_path):
+    """Settings built directly, with session state in a temporary SQLite file."""
+    from airtable_whatsapp_agent.config import Settings
+    return Settings(
+        **{name.lower(): value for name, value in REQUIRED_SETTINGS.items()},
+        sqlite_state_path=str(tmp_path / "state.db")
+    )
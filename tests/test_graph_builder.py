@@ -0,0 +1,208 @@
+"""
+Unit tests for the agent graph nodes.
+Chat models and embeddings are replaced by fakes, so no OpenAI access is needed.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain.schema import AIMessage
+
+from airtable_whatsapp_agent.agent.graph_builder import GraphBuilder
+from airtable_whatsapp_agent.agent.state_manager import StateManager
+from airtable_whatsapp_agent.agent.tool_registry import AIRTABLE_BATCH_LIMIT, ToolCategory, ToolDefinition, ToolRegistry
+from airtable_whatsapp_agent.models.agent import AgentStateType
+
+ANALYSIS_REPLY = '{"intent": "lookup", "requires_action": true, "urgency": "low"}'
+
+
+@pytest.fixture
+def builder():
+    tool_registry = MagicMock()
+    tool_registry.get_available_tools.return_value = []
+    with patch("langchain_openai.ChatOpenAI"), patch("langchain_openai.OpenAIEmbeddings"):
+        graph_builder = GraphBuilder(StateManager(), tool_registry, "test")
+    graph_builder.json_llm = MagicMock()
+    graph_builder.json_llm.ainvoke = AsyncMock(return_value=AIMessage(content=ANALYSIS_REPLY))
+    graph_builder.semantic_cache.embeddings.aembed_query = AsyncMock(return_value=[1.0, 0.0])
+    return graph_builder
+
+
+def new_state(builder, message="find the record for order 12345"):
+    return builder.state_manager.create_initial_state("s1", "+15550001", message)
+
+
+def seed_cache(builder, analysis):
+    scope = builder.semantic_cache.make_scope([], builder.state_manager.get_recent_context("s1"))
+    builder.semantic_cache.put([1.0, 0.0], scope, analysis)
+    return scope
+
+
+def tool_call(builder, state, tool_name, arguments):
+    """Queue a tool call the way the decision node does, via the parsed LLM function call."""
+    response = AIMessage(content="", additional_kwargs={"function_call": {"name": tool_name, "arguments": arguments}})
+    decision = builder._parse_decision_response(response, state)
+    for action in decision.actions:
+        builder.state_manager.add_pending_action(state["session_id"], action)
+    return decision
+
+
+def register_tool(registry, name, function):
+    registry.register_tool(ToolDefinition(
+        name=name,
+        category=ToolCategory.UTILITY,
+        description=name,
+        parameters={"record_id": {"type": "string", "required": True}},
+        required_permissions=[],
+        execution_function=function,
+        examples=[]
+    ))
+
+
+def airtable_registry(failing_record=None):
+    """Registry whose Airtable MCP server echoes updated records, failing any request that touches failing_record."""
+    mcp_manager = MagicMock()
+    requests = []
+
+    async def call_tool(server_name, tool_name, parameters, arguments_raw=None):
+        requests.append((tool_name, parameters))
+        records = parameters.get("records") or [{"id": parameters["record_id"], "fields": parameters["fields"]}]
+        if any(record["id"] == failing_record for record in records):
+            raise RuntimeError("Airtable rejected the request")
+        return records if tool_name == "update_records" else records[0]
+
+    mcp_manager.call_tool = call_tool
+    return ToolRegistry(mcp_manager), requests
+
+
+def queue_updates(builder, state, table_name, count):
+    for index in range(count):
+        tool_call(builder, state, "update_airtable_record", f'{{"table_name": "{table_name}", "record_id": "rec{index}", "fields": {{"Status": "Done"}}}}')
+    return list(state["pending_actions"])
+
+
+def test_analysis_falls_back_to_llm_when_embedding_fails(builder):
+    async def scenario():
+        state = new_state(builder)
+        seed_cache(builder, {"intent": "cached"})
+        builder.semantic_cache.embeddings.aembed_query = AsyncMock(side_effect=RuntimeError("embeddings unavailable"))
+        result = await builder._analyze_input_node(state)
+        assert result["current_state"] is AgentStateType.PROCESSING
+        assert result["metadata"]["analysis_intent"] == "lookup"
+        assert builder.json_llm.ainvoke.await_count == 1
+
+    asyncio.run(scenario())
+
+
+def test_analysis_is_served_from_cache_on_hit(builder):
+    async def scenario():
+        state = new_state(builder)
+        seed_cache(builder, {"intent": "cached", "requires_action": False})
+        result = await builder._analyze_input_node(state)
+        assert result["metadata"]["analysis_intent"] == "cached"
+        assert builder.json_llm.ainvoke.await_count == 0
+
+    asyncio.run(scenario())
+
+
+def test_empty_scope_skips_embedding_before_llm_and_caches_afterwards(builder):
+    async def scenario():
+        state = new_state(builder)
+        scope = builder.semantic_cache.make_scope([], builder.state_manager.get_recent_context("s1"))
+        await builder._analyze_input_node(state)
+        assert builder.json_llm.ainvoke.await_count == 1
+        await asyncio.gather(*builder._cache_tasks)
+        assert builder.semantic_cache.get([1.0, 0.0], scope)["intent"] == "lookup"
+
+    asyncio.run(scenario())
+
+
+def test_unparseable_analysis_is_not_cached(builder):
+    async def scenario():
+        state = new_state(builder)
+        scope = seed_cache(builder, {"intent": "other"})
+        builder.semantic_cache.embeddings.aembed_query = AsyncMock(return_value=[0.0, 1.0])
+        builder.json_llm.ainvoke = AsyncMock(return_value=AIMessage(content="not json"))
+        result = await builder._analyze_input_node(state)
+        assert result["metadata"]["analysis_intent"] == "unknown"
+        await asyncio.gather(*builder._cache_tasks)
+        assert builder.semantic_cache.get([0.0, 1.0], scope) is None
+
+    asyncio.run(scenario())
+
+
+def test_independent_tool_calls_run_concurrently(builder):
+    async def scenario():
+        state = new_state(builder)
+        builder.tool_registry = ToolRegistry(MagicMock())
+        started = []
+        both_started = asyncio.Event()
+
+        async def lookup(parameters):
+            started.append(parameters["record_id"])
+            if len(started) == 2:
+                both_started.set()
+            # Only completes if the other call is already in flight
+            await asyncio.wait_for(both_started.wait(), timeout=1)
+            return parameters["record_id"]
+
+        register_tool(builder.tool_registry, "lookup_order", lookup)
+        register_tool(builder.tool_registry, "lookup_customer", lookup)
+        decision = tool_call(builder, state, "lookup_order", '{"record_id": "rec1"}')
+        tool_call(builder, state, "lookup_customer", '{"record_id": "rec2"}')
+        assert decision.actions[0].tool_name == "lookup_order"
+        result = await builder._execute_action_node(state)
+        assert result["current_state"] is AgentStateType.EXECUTING_TASK
+        assert result["tool_results"]["lookup_order"]["result"] == "rec1"
+        assert result["tool_results"]["lookup_customer"]["result"] == "rec2"
+        assert all(entry["success"] for entry in result["tool_results"].values())
+        assert not result["pending_actions"]
+
+    asyncio.run(scenario())
+
+
+def test_record_updates_are_batched_per_table_and_split_per_record(builder):
+    async def scenario():
+        state = new_state(builder)
+        builder.tool_registry, requests = airtable_registry()
+        actions = queue_updates(builder, state, "Tasks", AIRTABLE_BATCH_LIMIT + 2)
+        tool_call(builder, state, "update_airtable_record", '{"table_name": "Contacts", "record_id": "recC", "fields": {"Name": "Ana"}}')
+        actions.append(state["pending_actions"][-1])
+        results = await builder._run_tool_calls(actions, frozenset({"airtable:write"}), "s1")
+        assert [(tool_name, len(parameters.get("records", [parameters]))) for tool_name, parameters in requests] == [
+            ("update_records", AIRTABLE_BATCH_LIMIT), ("update_records", 2), ("update_record", 1)
+        ]
+        assert len(results) == len(actions)
+        assert all(result.success for result in results)
+        assert [result.result["id"] for result in results] == [action.parameters["record_id"] for action in actions]
+
+    asyncio.run(scenario())
+
+
+def test_failed_batch_only_fails_its_own_records(builder):
+    async def scenario():
+        state = new_state(builder)
+        builder.tool_registry, requests = airtable_registry(failing_record="rec0")
+        actions = queue_updates(builder, state, "Tasks", AIRTABLE_BATCH_LIMIT + 2)
+        results = await builder._run_tool_calls(actions, frozenset({"airtable:write"}), "s1")
+        assert len(requests) == 2
+        assert not any(result.success for result in results[:AIRTABLE_BATCH_LIMIT])
+        assert all("rejected" in result.error for result in results[:AIRTABLE_BATCH_LIMIT])
+        assert [result.result["id"] for result in results[AIRTABLE_BATCH_LIMIT:]] == ["rec10", "rec11"]
+
+    asyncio.run(scenario())
+
+
+def test_failed_batch_puts_the_graph_in_error(builder):
+    async def scenario():
+        state = new_state(builder)
+        state["metadata"]["permissions"] = ["airtable:write"]
+        builder.tool_registry, _ = airtable_registry(failing_record="rec1")
+        queue_updates(builder, state, "Tasks", 3)
+        result = await builder._execute_action_node(state)
+        assert result["current_state"] is AgentStateType.ERROR
+        assert "rejected" in result["last_error"]
+        assert result["tool_results"]["update_airtable_record"]["success"] is False
+
+    asyncio.run(scenario())
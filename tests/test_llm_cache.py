@@ -0,0 +1,96 @@
+"""
+Unit tests for the exact-match and semantic LLM caches.
+Chat models and embeddings are replaced by fakes, so no OpenAI or Redis access is needed.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from langchain.schema import AIMessage, HumanMessage, SystemMessage
+from airtable_whatsapp_agent.agent.llm_cache import CachedChatOpenAI, SemanticLLMCache
+
+
+def make_llm(temperature=0, response=None):
+    llm = MagicMock()
+    llm.model_name = "gpt-test"
+    llm.temperature = temperature
+    llm.ainvoke = AsyncMock(return_value=response or AIMessage(content="answer"))
+    return llm
+
+
+PROMPT = [SystemMessage(content="system"), HumanMessage(content="hello")]
+
+
+def test_deterministic_call_is_served_from_cache():
+    llm = make_llm()
+    cached = CachedChatOpenAI(llm)
+    first = asyncio.run(cached.ainvoke(PROMPT))
+    second = asyncio.run(cached.ainvoke(PROMPT))
+    assert first.content == second.content == "answer"
+    assert llm.ainvoke.await_count == 1
+    assert cached.get_stats() == {"hits": 1, "misses": 1, "local_entries": 1}
+
+
+def test_sampled_call_bypasses_cache():
+    llm = make_llm(temperature=0.5)
+    cached = CachedChatOpenAI(llm)
+    asyncio.run(cached.ainvoke(PROMPT))
+    asyncio.run(cached.ainvoke(PROMPT))
+    assert llm.ainvoke.await_count == 2
+    assert cached.get_stats()["local_entries"] == 0
+
+
+def test_function_call_response_is_not_cached():
+    llm = make_llm(response=AIMessage(content="", additional_kwargs={"function_call": {"name": "search_records"}}))
+    cached = CachedChatOpenAI(llm)
+    asyncio.run(cached.ainvoke(PROMPT))
+    asyncio.run(cached.ainvoke(PROMPT))
+    assert llm.ainvoke.await_count == 2
+
+
+def test_cache_key_depends_on_tools():
+    cached = CachedChatOpenAI(make_llm())
+    assert cached.cache_key(PROMPT) != cached.cache_key(PROMPT, [{"name": "search_records"}])
+    assert cached.cache_key(PROMPT, [{"name": "a"}, {"name": "b"}]) == cached.cache_key(PROMPT, [{"name": "b"}, {"name": "a"}])
+
+
+def test_redis_failure_falls_through_to_model():
+    redis_client = MagicMock()
+    redis_client.get = AsyncMock(side_effect=ConnectionError("down"))
+    redis_client.set = AsyncMock(side_effect=ConnectionError("down"))
+    llm = make_llm()
+    cached = CachedChatOpenAI(llm, redis_client=redis_client)
+    assert asyncio.run(cached.ainvoke(PROMPT)).content == "answer"
+    # The local tier still serves the repeat
+    assert asyncio.run(cached.ainvoke(PROMPT)).content == "answer"
+    assert llm.ainvoke.await_count == 1
+
+
+def test_local_tier_is_bounded():
+    cached = CachedChatOpenAI(make_llm(), max_local_entries=2)
+    for index in range(3):
+        asyncio.run(cached.ainvoke([HumanMessage(content=str(index))]))
+    assert cached.get_stats()["local_entries"] == 2
+
+
+def test_semantic_cache_hit_requires_same_scope_and_similarity():
+    embeddings = MagicMock()
+    embeddings.aembed_query = AsyncMock(side_effect=lambda text: [3.0, 4.0] if text == "hi" else [4.0, -3.0])
+    cache = SemanticLLMCache(embeddings, threshold=0.9)
+    scope = cache.make_scope(["search_records"], "user: hi")
+    other_scope = cache.make_scope(["search_records"], "user: bye")
+    vector = asyncio.run(cache.embed("hi"))
+    assert abs(sum(v * v for v in vector) - 1.0) < 1e-9
+    cache.put(vector, scope, {"intent": "greeting"})
+    assert cache.get(vector, scope) == {"intent": "greeting"}
+    assert cache.get(vector, other_scope) is None
+    assert cache.get(asyncio.run(cache.embed("unrelated")), scope) is None
+    assert cache.get_stats() == {"hits": 1, "misses": 2, "scopes": 1}
+
+
+def test_semantic_cache_evicts_oldest_scope():
+    cache = SemanticLLMCache(MagicMock(), max_scopes=2)
+    for name in ("a", "b", "c"):
+        cache.put([1.0], name, name)
+    assert cache.get([1.0], "a") is None
+    assert cache.get([1.0], "c") == "c"
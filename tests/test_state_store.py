@@ -0,0 +1,107 @@
+"""
+Unit tests for persisting and restoring session state through the SQLite backend.
+"""
+
+import asyncio
+from datetime import datetime
+
+from airtable_whatsapp_agent.agent.state_manager import HistoryStore, StateManager
+from airtable_whatsapp_agent.agent.state_store import SQLiteStateBackend
+from airtable_whatsapp_agent.models.agent import AgentStateType, TaskStatus
+
+
+def test_session_round_trip(tmp_path):
+    async def scenario():
+        backend = SQLiteStateBackend(str(tmp_path / "state.db"))
+        manager = StateManager(backend=backend)
+        state = manager.create_initial_state("s1", "+15550001", "hello", context={"source": "test"})
+        manager.add_message_to_history("s1", "hello", "user")
+        manager.add_message_to_history("s1", "hi there", "assistant")
+        manager.update_state("s1", {"current_state": AgentStateType.WAITING_FOR_INPUT, "task_status": TaskStatus.IN_PROGRESS})
+        state["task_context"]["step"] = 2
+        assert await manager.persist("s1", "task_context")
+
+        restored = await StateManager(backend=backend).restore_state("s1")
+        assert restored is not None
+        assert restored["current_state"] is AgentStateType.WAITING_FOR_INPUT
+        assert restored["task_status"] is TaskStatus.IN_PROGRESS
+        assert isinstance(restored["created_at"], datetime)
+        assert restored["created_at"] == state["created_at"]
+        assert restored["user_phone"] == "+15550001"
+        assert restored["metadata"] == {"source": "test"}
+        assert restored["task_context"]["step"] == 2
+        history = restored["conversation_history"]
+        assert list(history.messages) == ["hello", "hi there"]
+        assert list(history.senders) == ["user", "assistant"]
+
+    asyncio.run(scenario())
+
+
+def test_history_keeps_newest_rows_in_every_column():
+    history = HistoryStore(maxlen=2)
+    history.extend_rows((index, f"user{index}", f"message {index}", "text", {}) for index in range(5))
+    assert len(history) == 2
+    assert history.row(0) == (3, "user3", "message 3", "text", {})
+    assert history.entry(-1)["sender"] == "user4"
+
+
+def test_only_dirty_fields_are_rewritten(tmp_path):
+    async def scenario():
+        backend = SQLiteStateBackend(str(tmp_path / "state.db"))
+        manager = StateManager(backend=backend)
+        manager.create_initial_state("s1", "+15550001")
+        assert await manager.persist("s1")
+        manager.update_state("s1", {"current_state": AgentStateType.PROCESSING})
+        assert await manager.persist("s1")
+        stored = await backend.load("s1")
+        assert stored["current_state"] is AgentStateType.PROCESSING
+        assert stored["user_phone"] == "+15550001"
+
+    asyncio.run(scenario())
+
+
+def test_undecodable_session_loads_as_missing(tmp_path):
+    async def scenario():
+        backend = SQLiteStateBackend(str(tmp_path / "state.db"))
+        manager = StateManager(backend=backend)
+        manager.create_initial_state("s1", "+15550001")
+        assert await manager.persist("s1")
+        backend._conn.execute("UPDATE sessions SET state = json_set(state, '$.current_state', 'bogus') WHERE session_id = 's1'")
+        backend._conn.commit()
+        assert await backend.load("s1") is None
+        assert await StateManager(backend=backend).restore_state("s1") is None
+
+    asyncio.run(scenario())
+
+
+def test_expired_sessions_are_pruned_on_save(tmp_path):
+    async def scenario():
+        backend = SQLiteStateBackend(str(tmp_path / "state.db"), ttl_seconds=60)
+        assert await backend.save("old", {"user_phone": "+15550001"}, [(1, "user", "hello", "text", {})])
+        backend._conn.execute("UPDATE sessions SET updated_at = updated_at - 3600 WHERE session_id = 'old'")
+        backend._conn.commit()
+        backend._next_prune = 0
+        assert await backend.save("new", {"user_phone": "+15550002"})
+        assert backend._conn.execute("SELECT session_id FROM sessions").fetchall() == [("new",)]
+        assert backend._conn.execute("SELECT COUNT(*) FROM history").fetchone() == (0,)
+        await backend.close()
+        await backend.close()
+
+    asyncio.run(scenario())
+
+
+def test_missing_session_loads_as_none(tmp_path):
+    backend = SQLiteStateBackend(str(tmp_path / "state.db"))
+    assert asyncio.run(backend.load("unknown")) is None
+
+
+def test_session_summary_is_a_dict_dropped_with_the_session():
+    manager = StateManager()
+    manager.create_initial_state("s1", "+15550001", "hello")
+    summary = manager.get_session_summary("s1")
+    assert type(summary) is dict and summary["user_phone"] == "+15550001"
+    summary["user_phone"] = "changed"
+    assert manager.get_session_summary("s1")["user_phone"] == "+15550001"
+    manager.cleanup_session("s1")
+    assert manager.get_session_summary("s1") is None
+    assert "s1" not in manager._summaries
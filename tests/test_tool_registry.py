@@ -0,0 +1,52 @@
+"""
+Unit tests for tool execution and the per-session result cache.
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+from airtable_whatsapp_agent.agent.tool_registry import ToolCategory, ToolDefinition, ToolRegistry
+
+
+def register_lookup(registry, calls):
+    async def lookup(parameters):
+        calls.append(parameters)
+        return len(calls)
+
+    registry.register_tool(ToolDefinition(
+        name="lookup",
+        category=ToolCategory.UTILITY,
+        description="lookup",
+        parameters={"filters": {"type": "object", "required": True}},
+        required_permissions=[],
+        execution_function=lookup,
+        examples=[],
+        idempotent=True,
+        ttl_seconds=60
+    ))
+
+
+def test_idempotent_results_are_reused_within_a_session():
+    async def scenario():
+        registry, calls = ToolRegistry(MagicMock()), []
+        register_lookup(registry, calls)
+        first = await registry.execute_tool("lookup", {"filters": {"a": 1}}, [], session_id="s1")
+        second = await registry.execute_tool("lookup", {"filters": {"a": 1}}, [], session_id="s1")
+        assert first.success and second.result == first.result
+        assert len(calls) == 1
+
+    asyncio.run(scenario())
+
+
+def test_unencodable_parameters_run_uncached():
+    async def scenario():
+        registry, calls = ToolRegistry(MagicMock()), []
+        register_lookup(registry, calls)
+        parameters = {"filters": {1: object()}}
+        first = await registry.execute_tool("lookup", parameters, [], session_id="s1")
+        second = await registry.execute_tool("lookup", parameters, [], session_id="s1")
+        assert first.success and second.success
+        assert [first.result, second.result] == [1, 2]
+        assert not registry._result_cache.get("s1")
+
+    asyncio.run(scenario())
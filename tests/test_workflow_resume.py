@@ -0,0 +1,119 @@
+"""
+Unit tests for resuming workflow sessions with follow-up messages.
+The graph and tool registry are replaced by fakes, so no OpenAI or MCP access is needed.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from airtable_whatsapp_agent.agent import workflow_manager as wm
+from airtable_whatsapp_agent.models.agent import AgentStateType
+
+
+class FakeGraph:
+    """Records the message of each run; the first run blocks until released."""
+
+    def __init__(self):
+        self.messages = []
+        self.first_run_started = asyncio.Event()
+        self.release_first_run = asyncio.Event()
+
+    async def ainvoke(self, state):
+        self.messages.append(state["current_message"])
+        if len(self.messages) == 1:
+            self.first_run_started.set()
+            await self.release_first_run.wait()
+        # A finished turn leaves the session idle, like the response node does
+        return {**state, "current_state": AgentStateType.IDLE, "response": "ok"}
+
+
+def make_manager(graph, settings=None):
+    mcp_manager = MagicMock()
+    mcp_manager.call_tool = AsyncMock(return_value={"success": True})
+    with patch.object(wm, "GraphBuilder") as graph_builder, patch.object(wm, "ToolRegistry"):
+        graph_builder.return_value.get_compiled_graph.return_value = graph
+        return wm.WorkflowManager(mcp_manager=mcp_manager, openai_api_key="test", settings=settings, max_concurrent_sessions=2)
+
+
+async def wait_for(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_message_during_active_run_is_processed():
+    async def scenario():
+        graph = FakeGraph()
+        manager = make_manager(graph)
+        try:
+            session_id = await manager.start_workflow("+15550001", "first")
+            await asyncio.wait_for(graph.first_run_started.wait(), 2.0)
+            assert await manager.send_message(session_id, "second")
+            # Let the batch window close while the first run still holds the session
+            await asyncio.sleep(wm.MESSAGE_BATCH_WINDOW_S * 2)
+            graph.release_first_run.set()
+            await wait_for(lambda: len(graph.messages) == 2)
+            assert graph.messages == ["first", "second"]
+        finally:
+            await manager.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_messages_within_batch_window_share_one_run():
+    async def scenario():
+        graph = FakeGraph()
+        graph.release_first_run.set()
+        manager = make_manager(graph)
+        try:
+            session_id = await manager.start_workflow("+15550002", "hello", wait=True)
+            assert await manager.send_message(session_id, "one")
+            assert await manager.send_message(session_id, "two")
+            await wait_for(lambda: len(graph.messages) == 2)
+            await asyncio.sleep(wm.MESSAGE_BATCH_WINDOW_S * 2)
+            assert graph.messages == ["hello", "one\ntwo"]
+        finally:
+            await manager.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_resume_without_pending_input_does_nothing():
+    async def scenario():
+        graph = FakeGraph()
+        graph.release_first_run.set()
+        manager = make_manager(graph)
+        try:
+            session_id = await manager.start_workflow("+15550003", "hello", wait=True)
+            await manager._resume_workflow(session_id)
+            assert graph.messages == ["hello"]
+        finally:
+            await manager.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_persisted_session_resumes_after_restart(settings):
+    async def scenario():
+        graph = FakeGraph()
+        graph.release_first_run.set()
+        manager = make_manager(graph, settings)
+        session_id = await manager.start_workflow("+15550004", "hello", context={"source": "test"}, wait=True)
+        manager.state_manager.add_message_to_history(session_id, "hello", "user")
+        await manager.shutdown()
+
+        restarted_graph = FakeGraph()
+        restarted_graph.release_first_run.set()
+        restarted = make_manager(restarted_graph, settings)
+        try:
+            await restarted.start_workflow("+15550004", "again", session_id=session_id, wait=True)
+            assert restarted_graph.messages == ["again"]
+            state = restarted.state_manager.get_state(session_id)
+            assert state["metadata"]["source"] == "test"
+            assert list(state["conversation_history"].messages) == ["hello"]
+            assert state["current_state"] is AgentStateType.IDLE
+        finally:
+            await restarted.shutdown()
+
+    asyncio.run(scenario())